@@ -7,10 +7,12 @@ and detect terminal dimensions.
 
 from __future__ import annotations
 
+import functools
 import re
 import shutil
 import sys
 import unicodedata
+from typing import Optional
 
 _ANSI_RE = re.compile(r"\033\[[0-9;]*[A-Za-z]")
 
@@ -32,12 +34,16 @@ def display_width(s: str) -> int:
     return total
 
 
-def pad_to_width(s: str, target_width: int, fill: str = " ") -> str:
+def pad_to_width(
+    s: str, target_width: int, fill: str = " ", current: Optional[int] = None
+) -> str:
     """Pad *s* with *fill* characters to reach *target_width* visible columns.
 
     If *s* already meets or exceeds *target_width*, it is returned unchanged.
+    Pass *current* when ``display_width(s)`` is already known to skip the rescan.
     """
-    current = display_width(s)
+    if current is None:
+        current = display_width(s)
     if current >= target_width:
         return s
     return s + fill * (target_width - current)
@@ -53,7 +59,11 @@ def get_terminal_width(default: int = 80, minimum: int = 40) -> int:
     return max(cols, minimum)
 
 
+@functools.cache
 def supports_unicode() -> bool:
-    """Check if stdout encoding supports Unicode box-drawing characters."""
+    """Check if stdout encoding supports Unicode box-drawing characters.
+
+    Cached: the stream encoding is fixed for the life of the process.
+    """
     encoding = getattr(sys.stdout, "encoding", "") or ""
     return "utf" in encoding.lower()
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-import multiprocessing
 import os
+import re
 import subprocess
 import time
 from pathlib import Path
@@ -14,6 +14,40 @@ from .models import BuildResult
 # Default timeout for build operations (5 minutes)
 TIMEOUT_BUILD = 300
 
+# MCU lines in the autoconf.h that Klipper's kconfig writes into OUT
+_AUTOCONF_MCU_RE = re.compile(rb'^#define CONFIG_MCU "([^"]+)"', re.MULTILINE)
+_AUTOCONF_BOARD_RE = re.compile(rb'^#define CONFIG_BOARD_DIRECTORY "([^"]+)"', re.MULTILINE)
+
+
+def out_of_tree_make_vars(
+    out_dir: Optional[str] = None, config_path: Optional[str] = None
+) -> list[str]:
+    """Return the make command-line variables for an out-of-tree build.
+
+    Both are passed as command-line assignments: Klipper's Makefile sets
+    ``KCONFIG_CONFIG`` itself, which overrides an environment variable but
+    not a make argument.
+    """
+    make_vars: list[str] = []
+    if out_dir is not None:
+        make_vars.append(f"OUT={Path(out_dir).expanduser().absolute()}/")
+    if config_path is not None:
+        make_vars.append(f"KCONFIG_CONFIG={Path(config_path).expanduser().absolute()}")
+    return make_vars
+
+
+def _built_mcu(out_path: Path) -> Optional[str]:
+    """Return the build's MCU from its autoconf.h, or None if unreadable.
+
+    Mirrors parse_mcu_from_config: CONFIG_MCU, else CONFIG_BOARD_DIRECTORY.
+    """
+    try:
+        header = (out_path / "autoconf.h").read_bytes()
+    except OSError:
+        return None
+    match = _AUTOCONF_MCU_RE.search(header) or _AUTOCONF_BOARD_RE.search(header)
+    return match.group(1).decode("utf-8", errors="replace") if match else None
+
 
 def run_menuconfig(klipper_dir: str, config_path: str) -> tuple[int, bool]:
     """Run make menuconfig with inherited stdio for ncurses TUI.
@@ -60,7 +94,14 @@ def run_menuconfig(klipper_dir: str, config_path: str) -> tuple[int, bool]:
     return result.returncode, was_saved
 
 
-def run_build(klipper_dir: str, timeout: int = TIMEOUT_BUILD, quiet: bool = False) -> BuildResult:
+def run_build(
+    klipper_dir: str,
+    timeout: int = TIMEOUT_BUILD,
+    quiet: bool = False,
+    out_dir: Optional[str] = None,
+    config_path: Optional[str] = None,
+    jobs: Optional[int] = None,
+) -> BuildResult:
     """Run make clean + make -j with streaming output.
 
     Executes build in klipper directory with inherited stdio for real-time
@@ -69,16 +110,28 @@ def run_build(klipper_dir: str, timeout: int = TIMEOUT_BUILD, quiet: bool = Fals
     Args:
         klipper_dir: Path to klipper source directory (supports ~)
         timeout: Seconds before timeout (default: TIMEOUT_BUILD)
+        out_dir: Build output directory (make OUT=); default klipper_dir/out
+        config_path: Config file to build from (make KCONFIG_CONFIG=);
+            default klipper_dir/.config. With out_dir, lets several builds
+            share one source tree concurrently. The built autoconf.h is
+            checked against this config's MCU before success is reported.
+        jobs: Parallel make jobs (default: all CPU cores)
 
     Returns:
         BuildResult with success status, firmware path/size, elapsed time
     """
     klipper_path = Path(klipper_dir).expanduser()
+    make_vars = out_of_tree_make_vars(out_dir, config_path)
+    if out_dir is not None:
+        out_path = Path(out_dir).expanduser().absolute()
+    else:
+        out_path = klipper_path / "out"
+
     start_time = time.monotonic()
     # Run make clean with inherited stdio for streaming output
     try:
         clean_result = subprocess.run(
-            ["make", "clean"],
+            ["make", *make_vars, "clean"],
             cwd=str(klipper_path),
             timeout=timeout,
             capture_output=quiet,
@@ -110,11 +163,11 @@ def run_build(klipper_dir: str, timeout: int = TIMEOUT_BUILD, quiet: bool = Fals
             error_output=error_output,
         )
 
-    # Run make -j with all available cores
-    nproc = multiprocessing.cpu_count()
+    # Run make -j with all available cores unless a job budget was given
+    nproc = jobs or os.cpu_count() or 1
     try:
         build_result = subprocess.run(
-            ["make", f"-j{nproc}"],
+            ["make", *make_vars, f"-j{nproc}"],
             cwd=str(klipper_path),
             timeout=timeout,
             capture_output=quiet,
@@ -148,7 +201,7 @@ def run_build(klipper_dir: str, timeout: int = TIMEOUT_BUILD, quiet: bool = Fals
         )
 
     # Check for firmware output
-    firmware_path = klipper_path / "out" / "klipper.bin"
+    firmware_path = out_path / "klipper.bin"
     if not firmware_path.exists():
         return BuildResult(
             success=False,
@@ -156,6 +209,22 @@ def run_build(klipper_dir: str, timeout: int = TIMEOUT_BUILD, quiet: bool = Fals
             error_message=f"Build succeeded but firmware not found: {firmware_path}",
         )
 
+    # Out-of-tree builds: make sure make really used the requested config
+    if config_path is not None:
+        from .config import parse_mcu_from_config
+
+        expected_mcu = parse_mcu_from_config(str(Path(config_path).expanduser()))
+        built_mcu = _built_mcu(out_path)
+        if expected_mcu is None or built_mcu != expected_mcu:
+            return BuildResult(
+                success=False,
+                elapsed_seconds=elapsed,
+                error_message=(
+                    f"Build output MCU '{built_mcu or 'unknown'}' does not match "
+                    f"config MCU '{expected_mcu or 'unknown'}'"
+                ),
+            )
+
     firmware_size = firmware_path.stat().st_size
 
     return BuildResult(
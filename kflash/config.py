@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import filecmp
+import functools
+import mmap
 import os
-import re
 import shutil
 import tempfile
 import time
@@ -13,10 +15,10 @@ from typing import Optional
 from .errors import ConfigError, format_error
 
 
-def get_config_dir(device_key: str) -> Path:
-    """Get XDG config directory for a device.
+@functools.cache
+def _config_base() -> Path:
+    """Resolve the kalico-flash config base directory once per process.
 
-    Returns path to ~/.config/kalico-flash/configs/{device-key}/
     Respects XDG_CONFIG_HOME if set and absolute.
     """
     xdg_config = os.environ.get("XDG_CONFIG_HOME")
@@ -24,7 +26,17 @@ def get_config_dir(device_key: str) -> Path:
         base = Path(xdg_config)
     else:
         base = Path.home() / ".config"
-    return base / "kalico-flash" / "configs" / device_key
+    return base / "kalico-flash" / "configs"
+
+
+@functools.lru_cache(maxsize=256)
+def get_config_dir(device_key: str) -> Path:
+    """Get XDG config directory for a device.
+
+    Returns path to ~/.config/kalico-flash/configs/{device-key}/
+    Respects XDG_CONFIG_HOME if set and absolute.
+    """
+    return _config_base() / device_key
 
 
 def rename_device_config_cache(old_key: str, new_key: str) -> bool:
@@ -48,29 +60,54 @@ def rename_device_config_cache(old_key: str, new_key: str) -> bool:
     return True
 
 
+# Files at or above this size are scanned via mmap instead of read()
+_MMAP_THRESHOLD = 4096
+
+
+def _find_config_value(buf, key: bytes) -> Optional[str]:
+    """Return the value of the first non-empty ``KEY="value"`` line in *buf*.
+
+    *buf* may be ``bytes`` or an ``mmap``; only the C-level ``find`` and
+    slicing are used so large files are never iterated line by line.
+    """
+    needle = key + b'="'
+    i = buf.find(needle)
+    while i != -1:
+        if i == 0 or buf[i - 1 : i] == b"\n":
+            start = i + len(needle)
+            end = buf.find(b'"', start)
+            if end == -1:
+                return None
+            if end > start:
+                return bytes(buf[start:end]).decode("utf-8", errors="replace")
+        i = buf.find(needle, i + 1)
+    return None
+
+
 def parse_mcu_from_config(config_path: str) -> Optional[str]:
     """Extract MCU type from .config file.
 
     Returns e.g., 'stm32h723xx', 'rp2040', or None if not found.
     """
-    path = Path(config_path)
-    if not path.exists():
-        return None
-
     try:
-        content = path.read_text(encoding="utf-8")
+        with open(config_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+                buf = f.read()
+            else:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                # Match: CONFIG_MCU="stm32h723xx"
+                mcu = _find_config_value(buf, b"CONFIG_MCU")
+                if mcu is not None:
+                    return mcu
+                # Fallback: CONFIG_BOARD_DIRECTORY="rp2040" (some archs have no CONFIG_MCU)
+                return _find_config_value(buf, b"CONFIG_BOARD_DIRECTORY")
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
     except OSError:
         return None
 
-    # Match: CONFIG_MCU="stm32h723xx"
-    match = re.search(r'^CONFIG_MCU="([^"]+)"', content, re.MULTILINE)
-    if match:
-        return match.group(1)
-
-    # Fallback: CONFIG_BOARD_DIRECTORY="rp2040" (some archs have no CONFIG_MCU)
-    match = re.search(r'^CONFIG_BOARD_DIRECTORY="([^"]+)"', content, re.MULTILINE)
-    return match.group(1) if match else None
-
 
 def _atomic_copy(src: str, dst: str) -> None:
     """Copy file atomically: copy to temp, fsync, rename.
@@ -114,6 +151,8 @@ class ConfigManager:
         self.klipper_dir = Path(klipper_dir).expanduser()
         self.cache_path = get_config_dir(device_key) / ".config"
         self.klipper_config_path = self.klipper_dir / ".config"
+        self._cache_path_str = str(self.cache_path)
+        self._klipper_config_path_str = str(self.klipper_config_path)
 
     def load_cached_config(self) -> bool:
         """Load cached config to klipper directory.
@@ -122,13 +161,13 @@ class ConfigManager:
         Returns False if no cached config exists.
         Creates klipper directory if needed.
         """
-        if not self.cache_path.exists():
+        if not os.path.exists(self._cache_path_str):
             return False
 
         # Ensure klipper directory exists
         self.klipper_dir.mkdir(parents=True, exist_ok=True)
 
-        _atomic_copy(str(self.cache_path), str(self.klipper_config_path))
+        _atomic_copy(self._cache_path_str, self._klipper_config_path_str)
         return True
 
     def clear_klipper_config(self) -> bool:
@@ -136,17 +175,19 @@ class ConfigManager:
 
         Returns True if file was removed, False if it didn't exist.
         """
-        if self.klipper_config_path.exists():
-            self.klipper_config_path.unlink()
-            return True
-        return False
+        try:
+            os.unlink(self._klipper_config_path_str)
+        except FileNotFoundError:
+            return False
+        return True
 
     def save_cached_config(self) -> None:
         """Save klipper config to cache.
 
+        No-op if the cached copy already has identical content.
         Raises ConfigError if klipper .config doesn't exist.
         """
-        if not self.klipper_config_path.exists():
+        if not os.path.exists(self._klipper_config_path_str):
             msg = format_error(
                 "Config error",
                 "No .config file found after menuconfig",
@@ -159,7 +200,14 @@ class ConfigManager:
             )
             raise ConfigError(msg)
 
-        _atomic_copy(str(self.klipper_config_path), str(self.cache_path))
+        # Skip the copy (and fsync) when menuconfig left the content unchanged,
+        # so the cache mtime keeps reflecting the last real config change.
+        if os.path.exists(self._cache_path_str) and filecmp.cmp(
+            self._klipper_config_path_str, self._cache_path_str, shallow=False
+        ):
+            return
+
+        _atomic_copy(self._klipper_config_path_str, self._cache_path_str)
 
     def validate_mcu(self, expected_mcu: str) -> tuple[bool, Optional[str]]:
         """Validate MCU type in klipper .config matches expected.
@@ -175,7 +223,7 @@ class ConfigManager:
         Raises:
             ConfigError: If .config doesn't exist or has no CONFIG_MCU
         """
-        if not self.klipper_config_path.exists():
+        if not os.path.exists(self._klipper_config_path_str):
             msg = format_error(
                 "Config error",
                 "No .config file for MCU validation",
@@ -188,7 +236,7 @@ class ConfigManager:
             )
             raise ConfigError(msg)
 
-        actual_mcu = parse_mcu_from_config(str(self.klipper_config_path))
+        actual_mcu = parse_mcu_from_config(self._klipper_config_path_str)
         if actual_mcu is None:
             return False, "unknown"
 
@@ -203,22 +251,24 @@ class ConfigManager:
         Returns mtime in seconds since epoch, or None if file doesn't exist.
         Used to detect if menuconfig saved changes.
         """
-        if not self.klipper_config_path.exists():
+        try:
+            return os.stat(self._klipper_config_path_str).st_mtime
+        except FileNotFoundError:
             return None
-        return self.klipper_config_path.stat().st_mtime
 
     def has_cached_config(self) -> bool:
         """Check if cached config exists for this device."""
-        return self.cache_path.exists()
+        return os.path.exists(self._cache_path_str)
 
     def get_cache_mtime(self) -> Optional[float]:
         """Get modification time of cached config.
 
         Returns mtime in seconds since epoch, or None if no cache exists.
         """
-        if not self.cache_path.exists():
+        try:
+            return os.stat(self._cache_path_str).st_mtime
+        except FileNotFoundError:
             return None
-        return self.cache_path.stat().st_mtime
 
     def get_cache_age_display(self) -> Optional[str]:
         """Get human-readable age of cached config.
@@ -230,21 +280,16 @@ class ConfigManager:
         if mtime is None:
             return None
 
-        age_seconds = time.time() - mtime
-        if age_seconds < 0:
-            age_seconds = 0
-
-        minutes = int(age_seconds / 60)
-        hours = int(age_seconds / 3600)
-        days = int(age_seconds / 86400)
+        age_seconds = max(0.0, time.time() - mtime)
 
-        if hours < 1:
-            label = f"{max(minutes, 1)} minutes ago"
-        elif days < 1:
-            label = f"{hours} hours ago" if hours > 1 else "1 hour ago"
-        else:
-            label = f"{days} days ago" if days > 1 else "1 day ago"
-            if days >= 90:
-                label += " (Recommend Review)"
+        if age_seconds < 3600:
+            return f"{max(int(age_seconds // 60), 1)} minutes ago"
+        if age_seconds < 86400:
+            hours = int(age_seconds // 3600)
+            return f"{hours} hours ago" if hours > 1 else "1 hour ago"
 
+        days = int(age_seconds // 86400)
+        label = f"{days} days ago" if days > 1 else "1 day ago"
+        if days >= 90:
+            label += " (Recommend Review)"
         return label
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import fnmatch
+import functools
+import os
 import re
-from pathlib import Path
+import select
+import time
 from typing import Optional
 
 from .models import DiscoveredDevice
@@ -13,28 +16,107 @@ SERIAL_BY_ID = "/dev/serial/by-id"
 
 # Supported device prefixes for Klipper/Katapult USB IDs (case-insensitive)
 SUPPORTED_PREFIXES = ("usb-klipper_", "usb-katapult_")
+_PREFIX_RE = re.compile(r"usb-(?:klipper|katapult)_", re.IGNORECASE)
+_IFACE_SUFFIX_RE = re.compile(r"-if\d+$")
 
 
-def scan_serial_devices() -> list:
-    """Scan /dev/serial/by-id/ and return all USB serial devices."""
-    serial_dir = Path(SERIAL_BY_ID)
-    if not serial_dir.is_dir():
+def scan_serial_devices(sort: bool = False) -> list:
+    """Scan /dev/serial/by-id/ and return all USB serial devices.
+
+    Entries are returned in directory order unless *sort* is True, in which
+    case they are ordered by filename (for user-facing listings).
+    """
+    try:
+        with os.scandir(SERIAL_BY_ID) as it:
+            devices = [DiscoveredDevice(path=e.path, filename=e.name) for e in it]
+    except (FileNotFoundError, NotADirectoryError):
         return []
-    devices = []
-    for entry in sorted(serial_dir.iterdir()):
-        devices.append(
-            DiscoveredDevice(
-                path=str(entry),
-                filename=entry.name,
-            )
-        )
+    if sort:
+        devices.sort(key=lambda d: d.filename)
     return devices
 
 
+# inotify event masks (linux/inotify.h)
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_TO
+
+
+class SerialDirWatcher:
+    """Wake up when /dev/serial/by-id changes instead of sleeping blindly.
+
+    Uses Linux inotify via ctypes; where that is unavailable, wait() just
+    sleeps for the timeout. Watches /dev/serial too, because udev removes
+    the by-id directory while no serial devices are connected.
+
+    Usage:
+        with SerialDirWatcher() as watcher:
+            while ...:
+                ...scan...
+                watcher.wait(0.5)
+    """
+
+    def __init__(self):
+        self._fd: Optional[int] = None
+        self._libc = None
+        self._watching_by_id = False
+
+    def __enter__(self) -> SerialDirWatcher:
+        try:
+            import ctypes
+
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return self
+        if fd < 0:
+            return self
+        self._fd = fd
+        self._libc = libc
+        parent = os.path.dirname(SERIAL_BY_ID)
+        if os.path.isdir(parent):
+            libc.inotify_add_watch(fd, parent.encode(), _IN_CREATE)
+        else:
+            libc.inotify_add_watch(fd, os.path.dirname(parent).encode(), _IN_CREATE)
+        self._watch_by_id()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def active(self) -> bool:
+        """True if inotify is in use (wait() wakes on changes, not just timeouts)."""
+        return self._fd is not None
+
+    def _watch_by_id(self) -> None:
+        if not self._watching_by_id and os.path.isdir(SERIAL_BY_ID):
+            wd = self._libc.inotify_add_watch(self._fd, SERIAL_BY_ID.encode(), _WATCH_MASK)
+            self._watching_by_id = wd >= 0
+
+    def wait(self, timeout: float) -> None:
+        """Block until a watched directory changes or *timeout* elapses."""
+        if self._fd is None:
+            time.sleep(timeout)
+            return
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self._fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            # by-id may have been (re)created; its old watch dies with it
+            self._watching_by_id = False
+            self._watch_by_id()
+
+
 def is_supported_device(filename: str) -> bool:
     """Return True if filename looks like a Klipper/Katapult USB device."""
-    lower = filename.lower()
-    return any(lower.startswith(prefix) for prefix in SUPPORTED_PREFIXES)
+    return _PREFIX_RE.match(filename) is not None
 
 
 def match_device(pattern: str, devices: list) -> Optional[DiscoveredDevice]:
@@ -43,21 +125,27 @@ def match_device(pattern: str, devices: list) -> Optional[DiscoveredDevice]:
     return matches[0] if matches else None
 
 
-def _prefix_variants(pattern: str) -> list[str]:
-    """Return pattern variants with both Klipper_ and katapult_ prefixes.
+def _translate(pattern: str) -> str:
+    """Translate a serial glob pattern into prefix-agnostic regex source.
+
+    A leading ``usb-Klipper_`` or ``usb-katapult_`` is replaced by an
+    alternation of both, so ``usb-katapult_rp2040_30*`` also matches
+    ``usb-Klipper_rp2040_30...`` regardless of which bootloader mode the
+    device booted into.
+    """
+    prefix = _PREFIX_RE.match(pattern)
+    if prefix:
+        return _PREFIX_RE.pattern + fnmatch.translate(pattern[prefix.end():])
+    return fnmatch.translate(pattern)
+
+
+@functools.lru_cache(maxsize=256)
+def _to_regex(pattern: str) -> re.Pattern:
+    """Compile a serial glob pattern into a case-insensitive, prefix-agnostic regex.
 
-    A pattern like ``usb-katapult_rp2040_30*`` returns both itself and
-    ``usb-Klipper_rp2040_30*`` so matching works regardless of which
-    bootloader mode the device booted into.
+    Memoized per pattern, so callers can look it up inside loops.
     """
-    lower = pattern.lower()
-    if lower.startswith("usb-klipper_"):
-        alt = "usb-katapult_" + pattern[len("usb-Klipper_"):]
-        return [pattern, alt]
-    if lower.startswith("usb-katapult_"):
-        alt = "usb-Klipper_" + pattern[len("usb-katapult_"):]
-        return [pattern, alt]
-    return [pattern]
+    return re.compile(_translate(pattern), re.IGNORECASE)
 
 
 def match_devices(pattern: str, devices: list) -> list[DiscoveredDevice]:
@@ -67,11 +155,8 @@ def match_devices(pattern: str, devices: list) -> list[DiscoveredDevice]:
     match ``usb-Klipper_*`` filenames and vice-versa so that devices are
     found regardless of which bootloader mode they booted into.
     """
-    variants = _prefix_variants(pattern)
-    return [
-        device for device in devices
-        if any(fnmatch.fnmatch(device.filename, v) for v in variants)
-    ]
+    match = _to_regex(pattern).match
+    return [device for device in devices if match(device.filename)]
 
 
 def find_registered_devices(devices: list, registry_devices: dict) -> tuple:
@@ -90,20 +175,62 @@ def find_registered_devices(devices: list, registry_devices: dict) -> tuple:
           unmatched = list of DiscoveredDevice not matching any pattern
     """
     matched = []
-    unmatched_devices = list(devices)  # copy
+    claimed: set[int] = set()  # ids of devices picked by some entry
 
     for entry in registry_devices.values():
-        variants = _prefix_variants(entry.serial_pattern)
+        match = _to_regex(entry.serial_pattern).match
         for device in devices:
-            if any(fnmatch.fnmatch(device.filename, v) for v in variants):
+            if match(device.filename):
                 matched.append((entry, device))
-                if device in unmatched_devices:
-                    unmatched_devices.remove(device)
+                claimed.add(id(device))
                 break
 
+    unmatched_devices = [device for device in devices if id(device) not in claimed]
     return matched, unmatched_devices
 
 
+def cross_reference_devices(devices: list, registry_devices: dict) -> tuple:
+    """Index every registry-entry/device match in both directions.
+
+    Unlike find_registered_devices, overlapping matches are all kept, so
+    callers can detect duplicates. Each entry pattern is compiled once.
+
+    Returns:
+        (entry_matches, device_matches) where:
+          entry_matches = entry key -> list of matching DiscoveredDevice
+          device_matches = device filename -> list of matching DeviceEntry
+    """
+    compiled = [
+        (entry, _to_regex(entry.serial_pattern).match) for entry in registry_devices.values()
+    ]
+    entry_matches: dict[str, list] = {entry.key: [] for entry, _ in compiled}
+    device_matches: dict[str, list] = {}
+    for device in devices:
+        filename = device.filename
+        for entry, match in compiled:
+            if match(filename):
+                entry_matches[entry.key].append(device)
+                device_matches.setdefault(filename, []).append(entry)
+    return entry_matches, device_matches
+
+
+def find_duplicate_matches(entry_matches: dict, device_matches: dict) -> tuple:
+    """Find ambiguous matches in a cross_reference_devices() index.
+
+    Returns:
+        (duplicate_entry_keys, duplicate_filenames) where an entry is a
+        duplicate if it matches several devices, and a device is a duplicate
+        if several entries match it or it belongs to a duplicate entry.
+    """
+    duplicate_entry_keys = {key for key, devices in entry_matches.items() if len(devices) > 1}
+    duplicate_filenames = {
+        filename for filename, entries in device_matches.items() if len(entries) > 1
+    }
+    for key in duplicate_entry_keys:
+        duplicate_filenames.update(device.filename for device in entry_matches[key])
+    return duplicate_entry_keys, duplicate_filenames
+
+
 def extract_mcu_from_serial(filename: str) -> Optional[str]:
     """Extract MCU type from a /dev/serial/by-id/ filename.
 
@@ -117,14 +244,15 @@ def extract_mcu_from_serial(filename: str) -> Optional[str]:
     Returns the MCU type without variant suffix (xx, xe, etc.) or None if
     pattern does not match.
     """
-    m = re.match(
-        r"usb-(?:Klipper|katapult)_([a-z0-9]+?)(?:x[a-z0-9]*)?_",
-        filename,
-        re.IGNORECASE,
-    )
-    if m:
-        return m.group(1).lower()
-    return None
+    parts = filename.split("_", 2)
+    if len(parts) < 3 or parts[0].lower() not in ("usb-klipper", "usb-katapult"):
+        return None
+    mcu = parts[1].lower()
+    if not (mcu.isascii() and mcu.isalnum()):
+        return None
+    # Strip variant suffix: first 'x' after the leading character onwards
+    idx = mcu.find("x", 1)
+    return mcu[:idx] if idx > 0 else mcu
 
 
 def generate_serial_pattern(filename: str) -> str:
@@ -138,5 +266,5 @@ def generate_serial_pattern(filename: str) -> str:
         -> usb-Klipper_stm32h723xx_29001A001151313531383332*
     """
     # Strip -ifNN suffix, add wildcard
-    base = re.sub(r"-if\d+$", "", filename)
+    base = _IFACE_SUFFIX_RE.sub("", filename)
     return base + "*"
@@ -15,14 +15,21 @@ Core logic lives in:
     - service.py: Klipper service lifecycle management
     - flasher.py: Dual-method flash operations
     - tui.py: Interactive menu
+
+Sibling modules are imported inside the command functions that use them,
+never at module level, so ``import kflash.flash`` stays cheap.
 """
 
 from __future__ import annotations
 
 import fnmatch
+import functools
+import os
+import re
 import shutil
 import sys
 from pathlib import Path
+from typing import Optional
 
 # Python version guard
 if sys.version_info < (3, 9):
@@ -31,84 +38,129 @@ if sys.version_info < (3, 9):
 
 VERSION = "0.1.0"
 
+# Flash All summary row: name truncated and padded to 20 columns in one format spec
+_SUMMARY_ROW = "  {name:<20.20}  {build:6s}  {flash:6s}  {verify}"
+
 DEFAULT_BLOCKED_DEVICES = [
     ("usb-beacon_*", "Beacon probe (not a Klipper MCU)"),
 ]
 
 
+@functools.lru_cache(maxsize=256)
 def _normalize_pattern(pattern: str) -> str:
     return pattern.strip().lower()
 
 
-def _build_blocked_list(registry_data) -> list[tuple[str, str | None]]:
-    blocked = [(pattern, reason) for pattern, reason in DEFAULT_BLOCKED_DEVICES]
-    for entry in getattr(registry_data, "blocked_devices", []):
-        blocked.append((entry.pattern, entry.reason))
-    return blocked
+class BlockList(list):
+    """(normalized pattern, reason) per blocked entry.
 
+    Also carries one union regex of all patterns, whose first matching
+    branch names the lowest blocked index. The classifier extends that
+    union with the supported-prefix check.
+    """
 
-def _blocked_reason_for_filename(
-    filename: str, blocked_list: list[tuple[str, str | None]]
-) -> str | None:
-    name = filename.lower()
-    for pattern, reason in blocked_list:
-        if fnmatch.fnmatch(name, _normalize_pattern(pattern)):
-            return reason or "Blocked by policy"
-    return None
+    union: Optional[re.Pattern]
+    classifier: re.Pattern
 
 
-def _blocked_reason_for_entry(entry, blocked_list: list[tuple[str, str | None]]) -> str | None:
-    serial_pattern = entry.serial_pattern.lower()
-    for pattern, reason in blocked_list:
+def _build_blocked_list(registry_data) -> BlockList:
+    """Build the blocked-pattern list, translating each glob to a regex once."""
+    raw = list(DEFAULT_BLOCKED_DEVICES)
+    for entry in getattr(registry_data, "blocked_devices", []):
+        raw.append((entry.pattern, entry.reason))
+    blocked = BlockList()
+    parts: list[str] = []
+    for index, (pattern, reason) in enumerate(raw):
         normalized = _normalize_pattern(pattern)
-        if fnmatch.fnmatch(serial_pattern, normalized) or fnmatch.fnmatch(
-            normalized, serial_pattern
-        ):
-            return reason or "Blocked by policy"
+        source = fnmatch.translate(normalized)
+        blocked.append((normalized, reason))
+        parts.append(f"(?P<blocked{index}>{source})")
+    # Alternation tries branches in order, so the first matching pattern wins
+    blocked.union = re.compile("|".join(parts)) if parts else None
+    supported = "|".join(re.escape(prefix) for prefix in _get_supported_prefixes())
+    blocked.classifier = re.compile("|".join([*parts, f"(?P<supported>{supported})"]))
+    return blocked
+
+
+@functools.cache
+def _get_supported_prefixes() -> tuple[str, ...]:
+    """Return discovery's supported prefixes, imported once on first use."""
     from .discovery import SUPPORTED_PREFIXES
 
-    if not any(serial_pattern.startswith(prefix) for prefix in SUPPORTED_PREFIXES):
+    return tuple(SUPPORTED_PREFIXES)
+
+
+def _device_block_reason(filename_lower: str, blocked_list: BlockList) -> str | None:
+    """Return why a device cannot be used (blocked or unsupported), else None.
+
+    One classifier match answers both questions: blocked patterns are tried
+    first, then the supported-prefix branch.
+    """
+    m = blocked_list.classifier.match(filename_lower)
+    if m is None:
+        return "Unsupported USB device"
+    if m.lastgroup == "supported":
+        return None
+    return blocked_list[int(m.lastgroup[len("blocked") :])][1] or "Blocked by policy"
+
+
+def _blocked_reason_for_entry(entry, blocked_list: BlockList) -> str | None:
+    serial_pattern = entry.serial_pattern_lower
+
+    # Forward check: the union's first matching branch is the lowest index
+    m = blocked_list.union.match(serial_pattern) if blocked_list.union else None
+    first = int(m.lastgroup[len("blocked") :]) if m else len(blocked_list)
+
+    # Reverse check: the entry's own glob may cover an earlier blocked pattern
+    for index in range(first):
+        if fnmatch.fnmatch(blocked_list[index][0], serial_pattern):
+            first = index
+            break
+    if first < len(blocked_list):
+        return blocked_list[first][1] or "Blocked by policy"
+    if not serial_pattern.startswith(_get_supported_prefixes()):
         return "Unsupported USB device"
     return None
 
 
 def _short_path(path_value: str) -> str:
     """Return filename-only for /dev/serial/by-id paths."""
-    try:
-        return Path(path_value).name
-    except (TypeError, ValueError):
-        return path_value
+    return path_value.rsplit("/", 1)[-1] if isinstance(path_value, str) else path_value
 
 
+class _Preflight:
+    """Emit preflight diagnostics as they are found; ``ok`` is False after any error."""
 
-def _emit_preflight(out, errors: list[str], warnings: list[str]) -> bool:
-    """Emit preflight warnings/errors. Returns True if no errors."""
-    for warning in warnings:
-        out.warn(f"Preflight: {warning}")
+    def __init__(self, out):
+        self.out = out
+        self.ok = True
 
-    if errors:
-        out.error("Preflight checks failed:")
-        for err in errors:
-            out.error(f"  - {err}")
-        return False
-    return True
+    def warn(self, message: str) -> None:
+        self.out.warn(f"Preflight: {message}")
+
+    def error(self, message: str) -> None:
+        if self.ok:
+            self.out.error("Preflight checks failed:")
+            self.ok = False
+        self.out.error(f"  - {message}")
 
 
 def _preflight_build(out, klipper_dir: str) -> bool:
     """Validate build prerequisites and Klipper directory."""
-    errors: list[str] = []
-    warnings: list[str] = []
+    from .flasher import _which
 
-    klipper_path = Path(klipper_dir).expanduser()
-    if not klipper_path.is_dir():
-        errors.append(f"Klipper directory not found: {klipper_path}")
-    elif not (klipper_path / "Makefile").is_file():
-        errors.append(f"Klipper Makefile not found in: {klipper_path}")
+    pf = _Preflight(out)
 
-    if shutil.which("make") is None:
-        errors.append("`make` not found in PATH")
+    klipper_path = os.path.expanduser(klipper_dir)
+    if not os.path.isdir(klipper_path):
+        pf.error(f"Klipper directory not found: {klipper_path}")
+    elif not os.path.isfile(os.path.join(klipper_path, "Makefile")):
+        pf.error(f"Klipper Makefile not found in: {klipper_path}")
 
-    return _emit_preflight(out, errors, warnings)
+    if _which("make") is None:
+        pf.error("`make` not found in PATH")
+
+    return pf.ok
 
 
 def _preflight_flash(
@@ -122,45 +174,97 @@ def _preflight_flash(
     if not _preflight_build(out, klipper_dir):
         return False
 
-    errors: list[str] = []
-    warnings: list[str] = []
+    from .flasher import _which
+
+    pf = _Preflight(out)
 
-    method = (preferred_method or "katapult").strip().lower()
+    method = preferred_method or "katapult"
     if method not in ("katapult", "make_flash"):
-        errors.append(f"Unknown flash method: {method}")
-        return _emit_preflight(out, errors, warnings)
+        pf.error(f"Unknown flash method: {method}")
+        return pf.ok
 
     methods = [method]
     if allow_fallback:
         methods.append("make_flash" if method == "katapult" else "katapult")
 
+    # Missing Katapult pieces are fatal only when there is no fallback method
+    katapult_report = pf.error if method == "katapult" and not allow_fallback else pf.warn
     if "katapult" in methods:
-        flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
-        if not flashtool.is_file():
-            msg = f"Katapult flashtool not found at {flashtool}"
-            if method == "katapult" and not allow_fallback:
-                errors.append(msg)
-            else:
-                warnings.append(msg)
-        if shutil.which("python3") is None:
-            msg = "`python3` not found in PATH (required for Katapult)"
-            if method == "katapult" and not allow_fallback:
-                errors.append(msg)
-            else:
-                warnings.append(msg)
+        flashtool = os.path.join(os.path.expanduser(katapult_dir), "scripts", "flashtool.py")
+        if not os.path.isfile(flashtool):
+            katapult_report(f"Katapult flashtool not found at {flashtool}")
+        if _which("python3") is None:
+            katapult_report("`python3` not found in PATH (required for Katapult)")
+
+    if _which("sudo") is None:
+        pf.warn("`sudo` not found; Klipper service control may fail")
+    if _which("systemctl") is None:
+        pf.warn("`systemctl` not found; Klipper service control may fail")
+
+    return pf.ok
+
 
-    if shutil.which("sudo") is None:
-        warnings.append("`sudo` not found; Klipper service control may fail")
-    if shutil.which("systemctl") is None:
-        warnings.append("`systemctl` not found; Klipper service control may fail")
+def _build_device_firmware(device_key: str, klipper_dir: str, work_dir: str, jobs: int):
+    """Build one device's firmware out-of-tree under *work_dir*.
 
-    return _emit_preflight(out, errors, warnings)
+    Copies the device's cached config to ``work_dir/.config`` and builds into
+    ``work_dir/out/`` via make KCONFIG_CONFIG=/OUT=, leaving klipper_dir's
+    own .config and out/ untouched so several builds can share the tree.
+    run_build checks that the output was built for this config's MCU.
+    """
+    from .build import run_build
+    from .config import get_config_dir
+
+    os.makedirs(work_dir, exist_ok=True)
+    config_path = os.path.join(work_dir, ".config")
+    shutil.copyfile(get_config_dir(device_key) / ".config", config_path)
+    return run_build(
+        klipper_dir,
+        quiet=True,
+        out_dir=os.path.join(work_dir, "out"),
+        config_path=config_path,
+        jobs=jobs,
+    )
 
 
 def _resolve_flash_method(entry, global_config) -> str:
-    """Resolve preferred flash method for a device."""
-    method = entry.flash_method or global_config.default_flash_method or "katapult"
-    return method.strip().lower()
+    """Resolve preferred flash method for a device.
+
+    Registry.load() already stores methods stripped and lowercased.
+    """
+    return entry.flash_method or global_config.default_flash_method or "katapult"
+
+
+def _fetch_version_info(klipper_dir: str, with_print_status: bool = False) -> tuple:
+    """Fetch Moonraker MCU versions, host version and print status concurrently.
+
+    The calls are independent network/git round-trips, so they run on a small
+    thread pool. Version lookups go through the short-lived response cache;
+    print status is only fetched when requested and is never cached.
+
+    Returns:
+        (mcu_versions, host_version, print_status) — each None if unavailable.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .moonraker import (
+        cached_call,
+        get_host_klipper_version,
+        get_mcu_versions,
+        get_print_status,
+    )
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        mcu_future = pool.submit(cached_call, "mcu_versions", get_mcu_versions)
+        host_future = pool.submit(
+            cached_call, f"host_version:{klipper_dir}", get_host_klipper_version, klipper_dir
+        )
+        status_future = pool.submit(get_print_status) if with_print_status else None
+        return (
+            mcu_future.result(),
+            host_future.result(),
+            status_future.result() if status_future is not None else None,
+        )
 
 
 def _remove_cached_config(device_key: str, out, prompt: bool = True, device_name: str | None = None) -> None:
@@ -341,27 +445,21 @@ def cmd_flash(
     Returns:
         0 on success, 1 on failure
     """
-    import time
-
-    from .build import TIMEOUT_BUILD, run_build, run_menuconfig
-    from .config import ConfigManager
-
-    # Late imports for fast startup
+    # Late imports for fast startup: only what the discovery phase needs.
+    # Moonraker, build, service and flasher are imported where first used so
+    # early-exit paths never pay for them.
     from .discovery import (
         extract_mcu_from_serial,
         find_registered_devices,
-        is_supported_device,
         match_device,
         match_devices,
         scan_serial_devices,
     )
     from .errors import ERROR_TEMPLATES, ConfigError, DiscoveryError
-    from .flasher import TIMEOUT_FLASH, flash_device, verify_device_path
-    from .service import klipper_service_stopped, verify_passwordless_sudo
-    from .tui import _get_menu_choice, wait_for_device
 
     # TTY check for interactive mode
-    if device_key is None and not sys.stdin.isatty():
+    interactive = device_key is None
+    if interactive and not sys.stdin.isatty():
         out.error("Interactive terminal required. Run from SSH terminal.")
         return 1
 
@@ -372,40 +470,31 @@ def cmd_flash(
         return 1
     blocked_list = _build_blocked_list(data)
 
-    # Fetch version information early for display in device selection
-    from .moonraker import (
-        get_host_klipper_version,
-        get_mcu_version_for_device,
-        get_mcu_versions,
-        get_print_status,
-        is_mcu_outdated,
-    )
-
-    mcu_versions = get_mcu_versions()
-    host_version = get_host_klipper_version(data.global_config.klipper_dir)
-
     # === Phase 1: Discovery ===
     out.phase("Discovery", "Scanning for USB devices...")
-    usb_devices = scan_serial_devices()
+    usb_devices = scan_serial_devices(sort=True)
+    if interactive and not usb_devices:
+        out.error("No USB devices found. Connect a board and try again.")
+        return 1
+
+    # With nothing plugged in there are no duplicates, and blocked_entries is
+    # only consulted by the interactive selection list
     duplicate_matches: dict[str, list] = {}
-    for entry in data.devices.values():
-        matches = match_devices(entry.serial_pattern, usb_devices)
-        if len(matches) > 1:
-            duplicate_matches[entry.key] = matches
     blocked_entries: dict[str, str] = {}
-    for entry in data.devices.values():
-        reason = _blocked_reason_for_entry(entry, blocked_list)
-        if reason:
-            blocked_entries[entry.key] = reason
-
-    if device_key is None:
+    if usb_devices:
+        for entry in data.devices.values():
+            matches = match_devices(entry.serial_pattern, usb_devices)
+            if len(matches) > 1:
+                duplicate_matches[entry.key] = matches
+            reason = _blocked_reason_for_entry(entry, blocked_list)
+            if reason:
+                blocked_entries[entry.key] = reason
+
+    if interactive:
         # Interactive mode: select from connected registered devices
-        if not usb_devices:
-            out.error("No USB devices found. Connect a board and try again.")
-            return 1
-
         # Cross-reference with registry
         matched, unmatched = find_registered_devices(usb_devices, data.devices)
+        all_matched = list(matched)  # Before duplicate/blocked filtering
 
         # Remove any entries with duplicate USB IDs or blocked status from selectable list
         if duplicate_matches:
@@ -435,9 +524,7 @@ def cmd_flash(
 
             if blocked_entries:
                 blocked_connected = [
-                    (entry, device)
-                    for entry, device in find_registered_devices(usb_devices, data.devices)[0]
-                    if entry.key in blocked_entries
+                    (entry, device) for entry, device in all_matched if entry.key in blocked_entries
                 ]
                 if blocked_connected:
                     out.error_with_recovery(
@@ -466,13 +553,9 @@ def cmd_flash(
             )
             out.phase("Discovery", "Found USB devices but none are registered:")
             for device in usb_devices:
-                blocked_reason = _blocked_reason_for_filename(device.filename, blocked_list)
-                if blocked_reason or not is_supported_device(device.filename):
-                    out.device_line(
-                        "BLK",
-                        device.filename,
-                        blocked_reason or "Unsupported USB device",
-                    )
+                blocked_reason = _device_block_reason(device.filename_lower, blocked_list)
+                if blocked_reason:
+                    out.device_line("BLK", device.filename, blocked_reason)
                 else:
                     out.device_line("NEW", device.filename, "Unregistered device")
             return 1
@@ -498,9 +581,7 @@ def cmd_flash(
 
         if blocked_entries:
             blocked_connected = [
-                (entry, device)
-                for entry, device in find_registered_devices(usb_devices, data.devices)[0]
-                if entry.key in blocked_entries
+                (entry, device) for entry, device in all_matched if entry.key in blocked_entries
             ]
             if blocked_connected:
                 out.phase("Discovery", "Blocked devices (not selectable):")
@@ -519,13 +600,18 @@ def cmd_flash(
             )
             return 1
 
+        # Fetch version information for display in device selection
+        from .moonraker import get_mcu_version_for_device
+
+        mcu_versions, host_version, _ = _fetch_version_info(data.global_config.klipper_dir)
+
         # Show numbered list of connected flashable devices
         out.phase("Discovery", f"Found {len(flashable_matched)} flashable device(s):")
         for i, (entry, device) in enumerate(flashable_matched):
             out.device_line(str(i + 1), f"{entry.name} ({entry.mcu})", device.filename)
             # Show MCU software version if available
             if mcu_versions:
-                version = get_mcu_version_for_device(entry.mcu)
+                version = get_mcu_version_for_device(entry.mcu, mcu_versions)
                 if version:
                     out.info("", f"     MCU software version: {version}")
 
@@ -546,6 +632,8 @@ def cmd_flash(
                 return 0
         else:
             # Multiple devices: prompt for selection
+            from .tui import _get_menu_choice
+
             choices = ["0"] + [str(i) for i in range(1, len(flashable_matched) + 1)]
             choice = _get_menu_choice(
                 choices,
@@ -653,7 +741,18 @@ def cmd_flash(
     out.step_divider()
 
     # === Moonraker Safety Check ===
-    print_status = get_print_status()
+    from .moonraker import is_mcu_outdated
+
+    if interactive:
+        # Versions were shown during selection; print status must be fresh
+        from .moonraker import get_print_status
+
+        print_status = get_print_status()
+    else:
+        # Explicit device: nothing displayed yet, fetch everything in one batch
+        mcu_versions, host_version, print_status = _fetch_version_info(
+            klipper_dir, with_print_status=True
+        )
 
     if print_status is None:
         # Moonraker unreachable - warn and require confirmation
@@ -682,7 +781,7 @@ def cmd_flash(
     out.step_divider()
 
     # === Version Information ===
-    # mcu_versions and host_version already fetched earlier for device selection display
+    # mcu_versions and host_version were fetched during selection or with print status
 
     if host_version:
         from .moonraker import detect_firmware_flavor
@@ -692,20 +791,22 @@ def cmd_flash(
         if mcu_versions:
             # Display all MCU versions, mark target with asterisk
             # Map device MCU type to Moonraker MCU name by checking mcu_constants
-            target_mcu = None
-            # Check friendly names first (no digits), then chip-type aliases
-            friendly = [n for n in mcu_versions if not any(c.isdigit() for c in n)]
-            chip_keys = [n for n in mcu_versions if any(c.isdigit() for c in n)]
-            for mcu_name in friendly + chip_keys:
-                if entry.mcu.lower() in mcu_name.lower() or mcu_name.lower() in entry.mcu.lower():
-                    target_mcu = mcu_name
-                    break
+            entry_mcu = entry.mcu.lower()
+            lowered = {n.lower(): n for n in mcu_versions}
+            # Friendly names have no digits; the rest are chip-type aliases
+            friendly_names = {n for n in mcu_versions if not any(c.isdigit() for c in n)}
+            # Exact name match first, then substring match checking
+            # friendly names before chip-type aliases
+            target_mcu = lowered.get(entry_mcu)
+            if target_mcu is None:
+                ordered = sorted(lowered.items(), key=lambda item: item[1] not in friendly_names)
+                target_mcu = next(
+                    (n for low, n in ordered if entry_mcu in low or low in entry_mcu), None
+                )
             # If no match found by name, use "main" as default for primary MCU
             if target_mcu is None and "main" in mcu_versions:
                 target_mcu = "main"
 
-            # Build set of friendly names (no digits = not a chip-type alias)
-            friendly_names = {n for n in mcu_versions if not any(c.isdigit() for c in n)}
             # If target matched a chip-type alias, find the friendly name
             # with the same version so we can mark it with [*]
             display_target = target_mcu
@@ -746,6 +847,9 @@ def cmd_flash(
     out.step_divider()
 
     # === Phase 2: Config ===
+    from .build import run_menuconfig
+    from .config import ConfigManager
+
     out.phase("Config", f"Loading config for {entry.name}...")
     config_mgr = ConfigManager(device_key, klipper_dir)
 
@@ -835,6 +939,8 @@ def cmd_flash(
     out.step_divider()
 
     # === Phase 3: Build ===
+    from .build import TIMEOUT_BUILD, run_build
+
     out.phase("Build", "Running make clean + make...")
     build_result = run_build(klipper_dir, timeout=TIMEOUT_BUILD)
 
@@ -858,6 +964,12 @@ def cmd_flash(
     out.step_divider()
 
     # === Phase 4: Flash ===
+    import time
+
+    from .flasher import TIMEOUT_FLASH, flash_device, verify_device_path
+    from .service import klipper_service_stopped, verify_passwordless_sudo
+    from .tui import wait_for_device
+
     out.phase("Flash", "Verifying device connection...")
     try:
         verify_device_path(device_path)
@@ -914,6 +1026,9 @@ def cmd_flash(
 
         # Context manager exited - Klipper has restarted
         out.phase("Service", "Klipper restarted")
+        from .moonraker import invalidate_cached
+
+        invalidate_cached("mcu_versions")  # MCU firmware just changed
     except Exception as e:
         template = ERROR_TEMPLATES["flash_failed"]
         out.error_with_recovery(
@@ -982,27 +1097,8 @@ def cmd_flash_all(registry, out) -> int:
     Returns:
         0 if all devices passed, 1 if any failed.
     """
-    import os
-    import shutil
-    import tempfile
-    import time
-
-    from .build import run_build
-
-    # Late imports
+    # Late imports: each stage imports what it needs so early exits stay cheap
     from .config import ConfigManager
-    from .discovery import extract_mcu_from_serial, match_device, match_devices, scan_serial_devices
-    from .flasher import TIMEOUT_FLASH, flash_device
-    from .models import BatchDeviceResult
-    from .moonraker import (
-        get_host_klipper_version,
-        get_mcu_version_for_device,
-        get_mcu_versions,
-        get_print_status,
-        is_mcu_outdated,
-    )
-    from .service import klipper_service_stopped, verify_passwordless_sudo
-    from .tui import wait_for_device
 
     # Load registry
     data = registry.load()
@@ -1015,12 +1111,14 @@ def cmd_flash_all(registry, out) -> int:
     katapult_dir = global_config.katapult_dir
 
     # === Preflight: Environment validation (SAFE-01) ===
-    preferred_method = (global_config.default_flash_method or "katapult").strip().lower()
+    preferred_method = global_config.default_flash_method or "katapult"
     allow_fallback = global_config.allow_flash_fallback
     if not _preflight_flash(out, klipper_dir, katapult_dir, preferred_method, allow_fallback):
         return 1
 
     # === Preflight: Moonraker safety check (SAFE-02) ===
+    from .moonraker import get_print_status
+
     print_status = get_print_status()
 
     if print_status is None:
@@ -1078,13 +1176,12 @@ def cmd_flash_all(registry, out) -> int:
         return 1
 
     flashable_devices = unblocked_devices
+    config_mgrs = {e.key: ConfigManager(e.key, klipper_dir) for e in flashable_devices}
 
     # Check cached configs exist
-    missing_configs: list[str] = []
-    for entry in flashable_devices:
-        config_mgr = ConfigManager(entry.key, klipper_dir)
-        if not config_mgr.cache_path.exists():
-            missing_configs.append(entry.name)
+    missing_configs = [
+        e.name for e in flashable_devices if not config_mgrs[e.key].has_cached_config()
+    ]
 
     if missing_configs:
         out.error("The following devices lack cached configs:")
@@ -1098,7 +1195,7 @@ def cmd_flash_all(registry, out) -> int:
 
     mcu_mismatches: list[tuple[str, str, str]] = []
     for entry in flashable_devices:
-        config_mgr = ConfigManager(entry.key, klipper_dir)
+        config_mgr = config_mgrs[entry.key]
         try:
             config_mgr.load_cached_config()
             is_match, actual_mcu = config_mgr.validate_mcu(entry.mcu)
@@ -1116,8 +1213,7 @@ def cmd_flash_all(registry, out) -> int:
 
     # Display config ages and warn on stale configs
     for entry in flashable_devices:
-        config_mgr = ConfigManager(entry.key, klipper_dir)
-        age_display = config_mgr.get_cache_age_display()
+        age_display = config_mgrs[entry.key].get_cache_age_display()
         age_str = age_display or "unknown"
         out.info("", f"  {entry.name}: config cached {age_str}")
         if age_display and "Recommend Review" in age_display:
@@ -1137,22 +1233,21 @@ def cmd_flash_all(registry, out) -> int:
     out.step_divider()
 
     # === Stage 2: Version check ===
-    host_version = get_host_klipper_version(klipper_dir)
-    mcu_versions = get_mcu_versions()
+    mcu_versions, host_version, _ = _fetch_version_info(klipper_dir)
 
     flash_list = list(flashable_devices)
 
     if host_version is None or mcu_versions is None:
         out.warn("Version check unavailable -- Moonraker not reachable. Flashing all devices.")
     else:
-        from .moonraker import detect_firmware_flavor
+        from .moonraker import detect_firmware_flavor, get_mcu_version_for_device, is_mcu_outdated
 
         out.phase("Version", f"Host: {detect_firmware_flavor(host_version)} {host_version}")
         outdated: list = []
         current: list = []
 
         for entry in flashable_devices:
-            mcu_ver = get_mcu_version_for_device(entry.mcu)
+            mcu_ver = get_mcu_version_for_device(entry.mcu, mcu_versions)
             if mcu_ver and not is_mcu_outdated(host_version, mcu_ver):
                 current.append(entry)
             else:
@@ -1161,6 +1256,10 @@ def cmd_flash_all(registry, out) -> int:
         if not outdated:
             # All match
             out.phase("Version", "All devices already match host version.")
+            if not sys.stdin.isatty():
+                # Nobody to ask: take the prompt's default instead of blocking
+                out.phase("Flash All", "All devices current -- nothing to do")
+                return 0
             try:
                 answer = input("  Flash anyway? [y/N]: ").strip().lower()
             except (EOFError, KeyboardInterrupt):
@@ -1185,6 +1284,8 @@ def cmd_flash_all(registry, out) -> int:
             # else flash_list remains all devices
 
     # Initialize results tracking
+    from .models import BatchDeviceResult
+
     results: list[BatchDeviceResult] = []
     for entry in flash_list:
         results.append(
@@ -1196,34 +1297,47 @@ def cmd_flash_all(registry, out) -> int:
         )
 
     # === Stage 3: Build all firmware ===
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
     out.step_divider()
     out.phase("Flash All", f"Building firmware for {len(flash_list)} device(s)...")
     temp_dir = tempfile.mkdtemp(prefix="kalico-flash-")
     total = len(flash_list)
 
     try:
-        for i, (entry, result) in enumerate(zip(flash_list, results)):
-            if i > 0:
-                out.device_divider(i + 1, total, entry.name)
-            print(f"  Building {i + 1}/{total}: {entry.name}...")
-            config_mgr = ConfigManager(entry.key, klipper_dir)
-            config_mgr.load_cached_config()
-
-            build_result = run_build(klipper_dir, quiet=True)
-
-            if build_result.success:
-                # Copy firmware to temp dir
-                device_fw_dir = os.path.join(temp_dir, entry.key)
-                os.makedirs(device_fw_dir, exist_ok=True)
-                fw_src = os.path.join(str(Path(klipper_dir).expanduser()), "out", "klipper.bin")
-                fw_dst = os.path.join(device_fw_dir, "klipper.bin")
-                shutil.copy2(fw_src, fw_dst)
-                result.build_ok = True
-                print(f"  \u2713 {entry.name} built ({i + 1}/{total})")
-            else:
-                result.error_message = build_result.error_message or "Build failed"
-                result.error_output = build_result.error_output
-                print(f"  \u2717 {entry.name} build failed ({i + 1}/{total})")
+        # Each device builds out-of-tree in its own temp subdirectory, so the
+        # builds can run concurrently against the shared Klipper source tree
+        ncpu = os.cpu_count() or 1
+        workers = min(total, ncpu)
+        jobs = max(1, ncpu // workers)  # split make -j across concurrent builds
+        klipper_path = os.path.expanduser(klipper_dir)  # invariant across devices
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            print("\n".join(f"  Building {entry.name}..." for entry in flash_list))
+            futures = {}
+            for entry, result in zip(flash_list, results):
+                work_dir = os.path.join(temp_dir, entry.key)
+                future = pool.submit(
+                    _build_device_firmware, entry.key, klipper_path, work_dir, jobs
+                )
+                futures[future] = (entry, result)
+
+            for done, future in enumerate(as_completed(futures), 1):
+                entry, result = futures[future]
+                build_result = future.result()
+                if build_result.success:
+                    # Stage firmware for Stage 4: hardlink (same temp dir), no metadata
+                    fw_dst = os.path.join(temp_dir, entry.key, "klipper.bin")
+                    try:
+                        os.link(build_result.firmware_path, fw_dst)
+                    except OSError:
+                        shutil.copyfile(build_result.firmware_path, fw_dst)
+                    result.build_ok = True
+                    print(f"  \u2713 {entry.name} built ({done}/{total})")
+                else:
+                    result.error_message = build_result.error_message or "Build failed"
+                    result.error_output = build_result.error_output
+                    print(f"  \u2717 {entry.name} build failed ({done}/{total})")
 
         # Check if any builds succeeded
         built_results = [(e, r) for e, r in zip(flash_list, results) if r.build_ok]
@@ -1232,15 +1346,27 @@ def cmd_flash_all(registry, out) -> int:
             return 1
 
         # === Stage 4: Flash all (inside single service stop) ===
+        import threading
+        import time
+
+        from .discovery import (
+            extract_mcu_from_serial,
+            match_device,
+            match_devices,
+            scan_serial_devices,
+        )
+        from .flasher import TIMEOUT_FLASH, flash_device
+        from .service import klipper_service_stopped, verify_passwordless_sudo
+        from .tui import wait_for_device
+
         out.step_divider()
         out.phase("Flash All", f"Flashing {len(built_results)} device(s)...")
 
         # Verify passwordless sudo
-        if not verify_passwordless_sudo():
+        sudo_ok = verify_passwordless_sudo()
+        if not sudo_ok:
             out.phase("Flash All", "Note: sudo may prompt for password")
 
-        flash_idx = 0
-        flash_total = len(built_results)
         used_paths: set[str] = set()
 
         with klipper_service_stopped(out=out):
@@ -1254,12 +1380,9 @@ def cmd_flash_all(registry, out) -> int:
                 if len(matches) > 1:
                     ambiguous_keys.add(entry.key)
 
+            # Resolve every target before flashing any of them
+            targets: list[tuple] = []
             for entry, result in built_results:
-                if flash_idx > 0:
-                    out.device_divider(flash_idx + 1, flash_total, entry.name)
-                    time.sleep(global_config.stagger_delay)
-                flash_idx += 1
-
                 # Ambiguous pattern guard
                 if entry.key in ambiguous_keys:
                     result.error_message = "Pattern matches multiple connected USB devices"
@@ -1270,7 +1393,7 @@ def cmd_flash_all(registry, out) -> int:
                 usb_device = match_device(entry.serial_pattern, usb_devices)
                 if usb_device is None:
                     result.error_message = "Device not found on USB"
-                    print(f"  \u2717 {entry.name} not found ({flash_idx}/{flash_total})")
+                    print(f"  \u2717 {entry.name} not found")
                     continue
 
                 # Duplicate USB path guard (SAFE-04)
@@ -1288,46 +1411,79 @@ def cmd_flash_all(registry, out) -> int:
                     out.warn(f"Skipping {entry.name}: {result.error_message}")
                     continue
 
-                # Determine flash method
-                method = entry.flash_method or global_config.default_flash_method or "katapult"
-                allow_fallback = global_config.allow_flash_fallback
+                targets.append((entry, result, usb_device))
+
+            # Set on Ctrl+C so in-flight flashes stop and skip their fallback
+            cancel = threading.Event()
 
-                fw_path = os.path.join(temp_dir, entry.key, "klipper.bin")
+            def flash_one(entry, result, usb_device) -> str:
+                """Flash and verify one device; returns its status line."""
+                work_dir = os.path.join(temp_dir, entry.key)
                 flash_result = flash_device(
                     device_path=usb_device.path,
-                    firmware_path=fw_path,
+                    firmware_path=os.path.join(work_dir, "klipper.bin"),
                     katapult_dir=katapult_dir,
                     klipper_dir=klipper_dir,
                     timeout=TIMEOUT_FLASH,
-                    preferred_method=method,
-                    allow_fallback=allow_fallback,
+                    preferred_method=_resolve_flash_method(entry, global_config),
+                    allow_fallback=global_config.allow_flash_fallback,
+                    cancel_event=cancel,
+                    # make flash must use this device's out-of-tree build
+                    out_dir=os.path.join(work_dir, "out"),
+                    config_path=os.path.join(work_dir, ".config"),
                 )
-
-                if flash_result.success:
-                    result.flash_ok = True
-                    # Post-flash verification
-                    verified, _, error_reason = wait_for_device(
-                        entry.serial_pattern,
-                        timeout=30.0,
-                        out=out,
-                    )
-                    if verified:
-                        result.verify_ok = True
-                        print(f"  ✓ {entry.name} flashed and verified ({flash_idx}/{flash_total})")
-                    else:
-                        result.error_message = error_reason or "Verification failed"
-                        print(
-                            f"  ✗ {entry.name} flash OK but verify failed"
-                            f" ({flash_idx}/{flash_total})"
-                        )
-
-                    # Re-scan after flash for next device
-                    usb_devices = scan_serial_devices()
-                else:
+                if not flash_result.success:
                     result.error_message = flash_result.error_message or "Flash failed"
-                    print(f"  \u2717 {entry.name} flash failed ({flash_idx}/{flash_total})")
+                    return f"  \u2717 {entry.name} flash failed"
+
+                result.flash_ok = True
+                if cancel.is_set():
+                    result.error_message = "Cancelled before verification"
+                    return f"  \u2717 {entry.name} flashed, verify cancelled"
+                # Post-flash verification
+                verified, _, error_reason = wait_for_device(
+                    entry.serial_pattern,
+                    timeout=30.0,
+                    out=out,
+                    stop=cancel.is_set,
+                )
+                if verified:
+                    result.verify_ok = True
+                    return f"  \u2713 {entry.name} flashed and verified"
+                result.error_message = error_reason or "Verification failed"
+                return f"  \u2717 {entry.name} flash OK but verify failed"
+
+            # Each USB device flashes independently, so run them concurrently
+            # unless limited to one at a time or sudo would need to prompt
+            flash_total = len(targets)
+            limit = global_config.max_parallel_flash or flash_total
+            if sudo_ok and flash_total > 1 and limit > 1:
+                with ThreadPoolExecutor(max_workers=min(limit, flash_total)) as pool:
+                    futures = []
+                    try:
+                        for i, (entry, result, usb_device) in enumerate(targets):
+                            if i > 0:
+                                # Minimum gap between flash starts (spreads USB resets)
+                                time.sleep(global_config.stagger_delay)
+                            futures.append(pool.submit(flash_one, entry, result, usb_device))
+                        for done, future in enumerate(as_completed(futures), 1):
+                            print(f"{future.result()} ({done}/{flash_total})")
+                    except KeyboardInterrupt:
+                        cancel.set()
+                        for future in futures:
+                            future.cancel()
+                        raise
+            else:
+                for i, (entry, result, usb_device) in enumerate(targets):
+                    if i > 0:
+                        out.device_divider(i + 1, flash_total, entry.name)
+                        time.sleep(global_config.stagger_delay)
+                    print(f"{flash_one(entry, result, usb_device)} ({i + 1}/{flash_total})")
 
         out.phase("Service", "Klipper restarted")
+        from .moonraker import invalidate_cached
+
+        invalidate_cached("mcu_versions")  # MCU firmware just changed
 
     finally:
         # Clean up temp dir
@@ -1336,8 +1492,7 @@ def cmd_flash_all(registry, out) -> int:
     # === Stage 5: Summary table ===
     out.step_divider()
     out.phase("Flash All", "Summary:")
-    out.info("", "  Device                Build   Flash   Verify")
-    out.info("", "  " + "-" * 48)
+    lines = ["  Device                Build   Flash   Verify", "  " + "-" * 48]
 
     all_passed = True
     for result in results:
@@ -1354,21 +1509,23 @@ def cmd_flash_all(registry, out) -> int:
         if not (result.build_ok and result.flash_ok and result.verify_ok):
             all_passed = False
 
-        name = result.device_name[:20].ljust(20)
-        out.info("", f"  {name}  {build_str:6s}  {flash_str:6s}  {verify_str}")
+        lines.append(
+            _SUMMARY_ROW.format(
+                name=result.device_name, build=build_str, flash=flash_str, verify=verify_str
+            )
+        )
 
         # Show build error output inline for failed builds (DBUG-01)
         if not result.build_ok and result.error_output:
-            lines = result.error_output.strip().splitlines()
-            tail = lines[-20:]
-            out.info("", f"  Build output (last {len(tail)} lines):")
-            for line in tail:
-                out.info("", f"    {line}")
+            tail = result.error_output.strip().splitlines()[-20:]
+            lines.append(f"  Build output (last {len(tail)} lines):")
+            lines.extend(f"    {line}" for line in tail)
 
     passed = sum(1 for r in results if r.build_ok and r.flash_ok and r.verify_ok)
     failed = len(results) - passed
-    out.info("", "")
-    out.info("", f"  {passed} passed, {failed} failed out of {len(results)} device(s)")
+    lines.append("")
+    lines.append(f"  {passed} passed, {failed} failed out of {len(results)} device(s)")
+    out.info_block("", lines)
 
     return 0 if all_passed else 1
 
@@ -1417,46 +1574,36 @@ def cmd_list_devices(registry, out) -> int:
         registry: Registry instance for device lookup.
         out: Output interface for user messages.
     """
-    from .discovery import is_supported_device, match_devices, scan_serial_devices
-    from .moonraker import get_host_klipper_version, get_mcu_version_for_device, get_mcu_versions
+    from .discovery import (
+        cross_reference_devices,
+        find_duplicate_matches,
+        scan_serial_devices,
+    )
 
     # Load registry and scan USB devices
     data = registry.load()
-    usb_devices = scan_serial_devices()
+    usb_devices = scan_serial_devices(sort=True)
     blocked_list = _build_blocked_list(data)
 
-    # Fetch version information
-    mcu_versions = get_mcu_versions()
-    host_version = None
-    if data.global_config:
-        host_version = get_host_klipper_version(data.global_config.klipper_dir)
+    # Block reason (or None) per USB device, computed once for every listing below
+    device_blocked: dict[str, Optional[str]] = {}
+    for device in usb_devices:
+        device_blocked[device.filename] = _device_block_reason(device.filename_lower, blocked_list)
 
     # Cross-reference registered vs discovered
-    entry_matches: dict[str, list] = {}
-    device_matches: dict[str, list] = {}
-    for entry in data.devices.values():
-        matches = match_devices(entry.serial_pattern, usb_devices)
-        entry_matches[entry.key] = matches
-        for device in matches:
-            device_matches.setdefault(device.filename, []).append(entry)
+    entry_matches, device_matches = cross_reference_devices(usb_devices, data.devices)
 
     matched_filenames = set(device_matches.keys())
     unmatched = [device for device in usb_devices if device.filename not in matched_filenames]
 
-    duplicate_entry_keys = {key for key, matches in entry_matches.items() if len(matches) > 1}
-    duplicate_devices = {
-        filename
-        for filename, entries in device_matches.items()
-        if len(entries) > 1 or any(entry.key in duplicate_entry_keys for entry in entries)
-    }
+    duplicate_entry_keys, duplicate_devices = find_duplicate_matches(entry_matches, device_matches)
 
     registered_connected = 0
     new_count = 0
     blocked_count = 0
     duplicate_count = 0
     for device in usb_devices:
-        blocked_reason = _blocked_reason_for_filename(device.filename, blocked_list)
-        if blocked_reason or not is_supported_device(device.filename):
+        if device_blocked[device.filename]:
             blocked_count += 1
             continue
         entries = device_matches.get(device.filename, [])
@@ -1480,18 +1627,26 @@ def cmd_list_devices(registry, out) -> int:
             f"{new_count} new, {blocked_count} blocked, {duplicate_count} duplicate"
         )
         out.info("Devices", f"No registered devices. {summary}.")
+        lines = []
         for device in usb_devices:
-            blocked_reason = _blocked_reason_for_filename(device.filename, blocked_list)
-            if blocked_reason or not is_supported_device(device.filename):
-                marker = "BLK"
-                detail = blocked_reason or "Unsupported USB device"
+            blocked_reason = device_blocked[device.filename]
+            if blocked_reason:
+                lines.append(("BLK", device.filename, blocked_reason))
             else:
-                marker = "NEW"
-                detail = "Unregistered device"
-            out.device_line(marker, device.filename, detail)
+                lines.append(("NEW", device.filename, "Unregistered device"))
+        out.device_lines(lines)
         out.info("Devices", "Press A to register a board.")
         return 0
 
+    # Fetch version information (through the short-lived response cache)
+    from .moonraker import cached_call, get_mcu_version_for_device, get_mcu_versions
+
+    if data.global_config:
+        mcu_versions, host_version, _ = _fetch_version_info(data.global_config.klipper_dir)
+    else:
+        mcu_versions = cached_call("mcu_versions", get_mcu_versions)
+        host_version = None
+
     # Normal display: show registered devices with connection status
     summary = (
         f"{len(usb_devices)} USB devices found: {registered_connected} registered, "
@@ -1528,7 +1683,7 @@ def cmd_list_devices(registry, out) -> int:
 
         # Show MCU software version if available
         if mcu_versions:
-            version = get_mcu_version_for_device(entry.mcu)
+            version = get_mcu_version_for_device(entry.mcu, mcu_versions)
             if version:
                 out.info("", f"       MCU software version: {version}")
 
@@ -1538,24 +1693,26 @@ def cmd_list_devices(registry, out) -> int:
         blocked_unmatched = []
         new_unmatched = []
         for device in unmatched:
-            blocked_reason = _blocked_reason_for_filename(device.filename, blocked_list)
-            if blocked_reason or not is_supported_device(device.filename):
-                blocked_unmatched.append((device, blocked_reason or "Unsupported USB device"))
+            blocked_reason = device_blocked[device.filename]
+            if blocked_reason:
+                blocked_unmatched.append((device, blocked_reason))
             else:
                 new_unmatched.append(device)
 
         # Show new (unregistered) devices
         if new_unmatched:
             out.info("", "")  # blank line for separation
-            for device in new_unmatched:
-                out.device_line("NEW", device.filename, "Unregistered device")
+            out.device_lines(
+                [("NEW", device.filename, "Unregistered device") for device in new_unmatched]
+            )
 
         # Show blocked devices with label
         if blocked_unmatched:
             out.info("", "")  # blank line for separation
             out.info("Blocked devices", "")
-            for device, reason in blocked_unmatched:
-                out.device_line("BLK", device.filename, reason)
+            out.device_lines(
+                [("BLK", device.filename, reason) for device, reason in blocked_unmatched]
+            )
 
         # Show hint if there are new unregistered devices
         if new_unmatched:
@@ -1582,9 +1739,11 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
     """
     # Import discovery functions for USB scanning
     from .discovery import (
+        _to_regex,
+        cross_reference_devices,
         extract_mcu_from_serial,
+        find_duplicate_matches,
         generate_serial_pattern,
-        is_supported_device,
         match_devices,
         scan_serial_devices,
     )
@@ -1603,23 +1762,25 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
 
         out.info("Selected", truncate_serial(selected.filename))
 
-        # Determine if this device is already registered
+        # Determine if this device is already registered: test the selected
+        # filename against each entry instead of matching every device
         registry_data = registry.load()
         devices = scan_serial_devices()
         existing_entry = None
-        for entry in registry_data.devices.values():
-            matches = match_devices(entry.serial_pattern, devices)
-            for matched_dev in matches:
-                if matched_dev.filename == selected.filename:
-                    existing_entry = entry
-                    break
-            if existing_entry is not None:
-                break
+        if any(device.filename == selected.filename for device in devices):
+            existing_entry = next(
+                (
+                    entry
+                    for entry in registry_data.devices.values()
+                    if _to_regex(entry.serial_pattern).match(selected.filename)
+                ),
+                None,
+            )
     else:
         # Full discovery scan and selection
         # Step 1: Scan USB devices
         out.info("Discovery", "Scanning for USB serial devices...")
-        devices = scan_serial_devices()
+        devices = scan_serial_devices(sort=True)
         if not devices:
             out.error("No USB devices found. Plug in a board and try again.")
             return 1
@@ -1627,15 +1788,9 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
         registry_data = registry.load()
         blocked_list = _build_blocked_list(registry_data)
 
-        entry_matches: dict[str, list] = {}
-        device_matches: dict[str, list] = {}
-        for entry in registry_data.devices.values():
-            matches = match_devices(entry.serial_pattern, devices)
-            entry_matches[entry.key] = matches
-            for device in matches:
-                device_matches.setdefault(device.filename, []).append(entry)
+        entry_matches, device_matches = cross_reference_devices(devices, registry_data.devices)
 
-        duplicate_entry_keys = {key for key, matches in entry_matches.items() if len(matches) > 1}
+        _, duplicate_filenames = find_duplicate_matches(entry_matches, device_matches)
 
         registered_devices: list[tuple[object, object]] = []
         new_devices: list = []
@@ -1643,15 +1798,14 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
         duplicate_devices: list[tuple[object, list]] = []
 
         for device in devices:
-            blocked_reason = _blocked_reason_for_filename(device.filename, blocked_list)
-            if blocked_reason or not is_supported_device(device.filename):
-                blocked_devices.append((device, blocked_reason or "Unsupported USB device"))
+            blocked_reason = _device_block_reason(device.filename_lower, blocked_list)
+            if blocked_reason:
+                blocked_devices.append((device, blocked_reason))
                 continue
 
-            entries = device_matches.get(device.filename, [])
-            if entries and (
-                len(entries) > 1 or any(entry.key in duplicate_entry_keys for entry in entries)
-            ):
+            filename = device.filename
+            entries = device_matches.get(filename, [])
+            if filename in duplicate_filenames:
                 duplicate_devices.append((device, entries))
                 continue
 
@@ -1670,31 +1824,39 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
         selectable: list[tuple[object, object | None]] = []
         if registered_devices:
             out.info("Discovery", f"Registered devices ({len(registered_devices)}):")
+            lines = []
             for device, entry in registered_devices:
                 idx = len(selectable) + 1
                 label = f"{idx}. {device.filename}"
                 detail = f"{entry.name} ({entry.mcu})"
-                out.device_line("REG", label, detail)
+                lines.append(("REG", label, detail))
                 selectable.append((device, entry))
+            out.device_lines(lines)
 
         if new_devices:
             out.info("Discovery", f"New devices ({len(new_devices)}):")
+            lines = []
             for device in new_devices:
                 idx = len(selectable) + 1
                 label = f"{idx}. {device.filename}"
-                out.device_line("NEW", label, "Unregistered device")
+                lines.append(("NEW", label, "Unregistered device"))
                 selectable.append((device, None))
+            out.device_lines(lines)
 
         if duplicate_devices:
             out.info("Discovery", f"Duplicate devices (not eligible) ({len(duplicate_devices)}):")
-            for device, entries in duplicate_devices:
-                names = ", ".join(entry.name for entry in entries)
-                out.device_line("DUP", device.filename, f"Matches: {names}")
+            out.device_lines(
+                [
+                    ("DUP", device.filename, "Matches: " + ", ".join(e.name for e in entries))
+                    for device, entries in duplicate_devices
+                ]
+            )
 
         if blocked_devices:
             out.info("Discovery", f"Blocked devices (not eligible) ({len(blocked_devices)}):")
-            for device, reason in blocked_devices:
-                out.device_line("BLK", device.filename, reason)
+            out.device_lines(
+                [("BLK", device.filename, reason) for device, reason in blocked_devices]
+            )
 
         if not selectable:
             out.error("No eligible devices available to add.")
@@ -1728,7 +1890,7 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
         registry.remove(existing.key)
         out.success(f"Removed existing device '{existing.name}'")
         _remove_cached_config(existing.key, out, prompt=True, device_name=existing.name)
-        registry_data = registry.load()
+        registry_data.devices.pop(existing.key, None)
 
     out.step_divider()
 
@@ -1737,20 +1899,18 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
         out.info("Setup", "First device registration - configuring global paths...")
         klipper_dir = out.prompt("Klipper source directory", default="~/klipper")
         katapult_dir = out.prompt("Katapult source directory", default="~/katapult")
-        registry.save_global(
-            GlobalConfig(
-                klipper_dir=klipper_dir,
-                katapult_dir=katapult_dir,
-                default_flash_method="katapult",
-                allow_flash_fallback=True,
-            )
+        registry_data.global_config = GlobalConfig(
+            klipper_dir=klipper_dir,
+            katapult_dir=katapult_dir,
+            default_flash_method="katapult",
+            allow_flash_fallback=True,
         )
+        registry.save_global(registry_data.global_config)
         out.success("Global configuration saved")
 
     out.step_divider()
 
     # Step 4: Display name (device key is auto-generated)
-    registry_data = registry.load()
     existing_names = {e.name.lower() for e in registry_data.devices.values()}
     display_name = None
     for _attempt in range(3):
@@ -1771,7 +1931,7 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
     from .validation import generate_device_key
 
     try:
-        device_key = generate_device_key(display_name, registry)
+        device_key = generate_device_key(display_name, registry_data.devices)
     except ValueError:
         out.error("Display name must contain at least one letter or number.")
         return 1
@@ -1805,17 +1965,17 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
             out.device_line("DUP", device.filename, "Duplicate USB ID")
         return 1
 
-    # Check for pattern overlap with existing devices
+    # Check for pattern overlap with existing devices: exact owner first, then globs
+    pattern_owners = {e.serial_pattern: key for key, e in registry_data.devices.items()}
+    owner_key = pattern_owners.get(serial_pattern)
+    if owner_key is not None:
+        out.error(
+            f"Serial pattern already registered to '{owner_key}'. "
+            "Remove it first or choose a different device."
+        )
+        return 1
     for existing_key, existing_entry in registry_data.devices.items():
-        if existing_entry.serial_pattern == serial_pattern:
-            out.error(
-                f"Serial pattern already registered to '{existing_key}'. "
-                "Remove it first or choose a different device."
-            )
-            return 1
-        from .discovery import _prefix_variants
-        existing_variants = _prefix_variants(existing_entry.serial_pattern)
-        if any(fnmatch.fnmatch(selected.filename, v) for v in existing_variants):
+        if _to_regex(existing_entry.serial_pattern).match(selected.filename):
             out.error(
                 f"Selected device matches existing entry '{existing_key}'. "
                 "Remove it first or replace it."
@@ -1880,12 +2040,11 @@ def cmd_add_device(registry, out, selected_device=None) -> int:
             from .build import run_menuconfig
             from .config import ConfigManager
 
-            data = registry.load()
-            if data.global_config is None:
+            if registry_data.global_config is None:
                 out.warn("Cannot run menuconfig: global config not set")
                 return 0
 
-            klipper_dir = data.global_config.klipper_dir
+            klipper_dir = registry_data.global_config.klipper_dir
             config_mgr = ConfigManager(device_key, klipper_dir)
             had_cache = config_mgr.has_cached_config()
 
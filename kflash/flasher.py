@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
-import fnmatch
+import dataclasses
+import errno
+import functools
 import os
 import re
+import shutil
 import subprocess
+import threading
 import time
-from pathlib import Path
+from collections import deque
 from typing import Callable, Optional
 
+from .build import out_of_tree_make_vars
 from .errors import DiscoveryError, format_error
 from .models import FlashResult, KatapultCheckResult
 
@@ -21,6 +26,152 @@ BOOTLOADER_ENTRY_TIMEOUT = 5.0   # Max wait for flashtool.py -r
 USB_RESET_SLEEP = 0.5            # Pause between deauthorize/reauthorize
 POLL_INTERVAL = 0.25             # Serial device polling interval
 POLL_TIMEOUT = 5.0               # Max wait for device reappearance
+CANCEL_POLL_INTERVAL = 0.2       # How often a running flash checks its cancel event
+FAILURE_TAIL_LINES = 20          # Streamed-output lines kept for a failure message
+
+# Hex serial from a Klipper_/katapult_ by-id filename
+_SERIAL_HEX_RE = re.compile(r'usb-(?:Klipper|katapult)_[a-zA-Z0-9]+_([A-Fa-f0-9]+)')
+
+# make flash builds/flashes from the shared klipper_dir, so never run two at once
+_make_flash_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _expand_dir(path: str) -> str:
+    """Expand ``~`` in a configured source directory (memoized per path)."""
+    return os.path.expanduser(path)
+
+
+@functools.cache
+def _which(name: str) -> Optional[str]:
+    """Resolve *name* on PATH once per process (None if not found)."""
+    return shutil.which(name)
+
+
+def _executable(name: str) -> str:
+    """Return the cached PATH location of *name* (bare name if not found)."""
+    return _which(name) or name
+
+
+def _flashtool_path(katapult_dir: str) -> str:
+    """Return the path of Katapult's flashtool.py under *katapult_dir*."""
+    return os.path.join(_expand_dir(katapult_dir), "scripts", "flashtool.py")
+
+
+# flashtool.py paths already seen on disk; a missing one is re-checked next time
+_flashtool_found: set[str] = set()
+
+
+def _find_flashtool(katapult_dir: str) -> Optional[str]:
+    """Return the flashtool.py path if it exists, else None.
+
+    A found path is remembered so repeated flashes in a batch skip the stat.
+    """
+    flashtool = _flashtool_path(katapult_dir)
+    if flashtool in _flashtool_found:
+        return flashtool
+    if os.path.exists(flashtool):
+        _flashtool_found.add(flashtool)
+        return flashtool
+    return None
+
+
+def _failure_output(result: subprocess.CompletedProcess) -> str:
+    """Decode a failed run's stderr (or stdout if stderr is empty).
+
+    Output is captured as bytes and only decoded here, so successful runs
+    never pay for decoding build/flash chatter.
+    """
+    for stream in (result.stderr, result.stdout):
+        text = stream.decode("utf-8", errors="replace").strip() if stream else ""
+        if text:
+            return text
+    return ""
+
+
+def _run_flash_command(
+    cmd: list[str],
+    timeout: int,
+    cwd: Optional[str] = None,
+    log: Optional[Callable[[str], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> tuple[int, str]:
+    """Run a flash command and return (returncode, failure output).
+
+    Without *log* or *cancel_event*, output is captured as bytes and decoded
+    only on failure. Otherwise stdout and stderr lines are forwarded to *log*
+    (if given) as they arrive, and the failure message is the last
+    FAILURE_TAIL_LINES of stderr (stdout if stderr was empty), since the
+    full output was already shown. Setting *cancel_event* terminates the
+    command within CANCEL_POLL_INTERVAL; the output is then "Flash cancelled".
+
+    Raises:
+        subprocess.TimeoutExpired: If the command outlives *timeout*.
+    """
+    if log is None and cancel_event is None:
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, timeout=timeout)
+        return result.returncode, _failure_output(result) if result.returncode else ""
+
+    stdout_tail: deque[str] = deque(maxlen=FAILURE_TAIL_LINES)
+    stderr_tail: deque[str] = deque(maxlen=FAILURE_TAIL_LINES)
+    tail_lock = threading.Lock()  # readers may outlive the join below
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},  # flashtool.py progress lines
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    def pump(stream, tail: deque[str]) -> None:
+        for raw in stream:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line:
+                with tail_lock:
+                    tail.append(line)
+                if log is not None:
+                    log(line)
+
+    readers = [
+        threading.Thread(target=pump, args=(proc.stdout, stdout_tail), daemon=True),
+        threading.Thread(target=pump, args=(proc.stderr, stderr_tail), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            if cancel_event is not None:
+                remaining = min(remaining, CANCEL_POLL_INTERVAL)
+            try:
+                returncode = proc.wait(timeout=remaining)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel_event is not None and cancel_event.is_set():
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=2)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                        proc.wait()
+                    return proc.returncode, "Flash cancelled"
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        # Grandchildren (e.g. under make) may keep the pipes open; don't wait on them
+        for reader in readers:
+            reader.join(timeout=1.0)
+    if not returncode:
+        return returncode, ""
+    with tail_lock:
+        lines = list(stderr_tail) or list(stdout_tail)
+    return returncode, "\n".join(lines)
 
 
 def verify_device_path(device_path: str) -> None:
@@ -32,7 +183,7 @@ def verify_device_path(device_path: str) -> None:
     Raises:
         DiscoveryError: If the device is not found.
     """
-    if not Path(device_path).exists():
+    if not os.path.exists(device_path):
         msg = format_error(
             "Device disconnected",
             "Device no longer connected after build",
@@ -52,6 +203,8 @@ def _try_katapult_flash(
     firmware_path: str,
     katapult_dir: str,
     timeout: int,
+    log: Optional[Callable[[str], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
 ) -> FlashResult:
     """Attempt to flash using Katapult flashtool.py.
 
@@ -60,33 +213,33 @@ def _try_katapult_flash(
         firmware_path: Path to the firmware binary (klipper.bin).
         katapult_dir: Path to the Katapult directory.
         timeout: Seconds before timeout.
+        log: Optional callback receiving flashtool output as it arrives.
+        cancel_event: Optional event that aborts the flash when set.
 
     Returns:
         FlashResult with success status and details.
     """
     start = time.monotonic()
 
-    # Build path to flashtool.py
-    flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
-
-    if not flashtool.exists():
+    flashtool = _find_flashtool(katapult_dir)
+    if flashtool is None:
         return FlashResult(
             success=False,
             method="katapult",
             elapsed_seconds=time.monotonic() - start,
-            error_message=f"Katapult flashtool not found: {flashtool}",
+            error_message=f"Katapult flashtool not found: {_flashtool_path(katapult_dir)}",
         )
 
     try:
-        result = subprocess.run(
-            ["python3", str(flashtool), "-d", device_path, "-f", firmware_path],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+        returncode, output = _run_flash_command(
+            [_executable("python3"), flashtool, "-d", device_path, "-f", firmware_path],
+            timeout,
+            log=log,
+            cancel_event=cancel_event,
         )
         elapsed = time.monotonic() - start
 
-        if result.returncode == 0:
+        if returncode == 0:
             return FlashResult(
                 success=True,
                 method="katapult",
@@ -97,7 +250,7 @@ def _try_katapult_flash(
                 success=False,
                 method="katapult",
                 elapsed_seconds=elapsed,
-                error_message=result.stderr.strip() or result.stdout.strip(),
+                error_message=output,
             )
 
     except subprocess.TimeoutExpired:
@@ -113,6 +266,10 @@ def _try_make_flash(
     device_path: str,
     klipper_dir: str,
     timeout: int,
+    log: Optional[Callable[[str], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    out_dir: Optional[str] = None,
+    config_path: Optional[str] = None,
 ) -> FlashResult:
     """Attempt to flash using make flash.
 
@@ -120,24 +277,34 @@ def _try_make_flash(
         device_path: Path to the USB serial device.
         klipper_dir: Path to the Klipper directory.
         timeout: Seconds before timeout.
+        log: Optional callback receiving make output as it arrives.
+        cancel_event: Optional event that aborts the flash when set.
+        out_dir: Out-of-tree build directory (make OUT=), if built that way.
+        config_path: Config the build used (make KCONFIG_CONFIG=).
 
     Returns:
         FlashResult with success status and details.
     """
     start = time.monotonic()
-    klipper_path = Path(klipper_dir).expanduser()
+    klipper_path = _expand_dir(klipper_dir)
 
     try:
-        result = subprocess.run(
-            ["make", f"FLASH_DEVICE={device_path}", "flash"],
-            cwd=str(klipper_path),
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        with _make_flash_lock:
+            returncode, output = _run_flash_command(
+                [
+                    _executable("make"),
+                    *out_of_tree_make_vars(out_dir, config_path),
+                    f"FLASH_DEVICE={device_path}",
+                    "flash",
+                ],
+                timeout,
+                cwd=klipper_path,
+                log=log,
+                cancel_event=cancel_event,
+            )
         elapsed = time.monotonic() - start
 
-        if result.returncode == 0:
+        if returncode == 0:
             return FlashResult(
                 success=True,
                 method="make_flash",
@@ -148,7 +315,7 @@ def _try_make_flash(
                 success=False,
                 method="make_flash",
                 elapsed_seconds=elapsed,
-                error_message=result.stderr.strip() or result.stdout.strip(),
+                error_message=output,
             )
 
     except subprocess.TimeoutExpired:
@@ -160,36 +327,69 @@ def _try_make_flash(
         )
 
 
+def _follow_link(path: str) -> str:
+    """Resolve one symlink hop of *path* (whose parent must be a real directory).
+
+    Udev and sysfs links are single relative hops, so one readlink replaces
+    realpath's lstat of every path component. Falls back to realpath if
+    *path* is not a symlink.
+    """
+    try:
+        target = os.readlink(path)
+    except OSError as exc:
+        if exc.errno != errno.EINVAL:
+            raise
+        return os.path.realpath(path)
+    return os.path.normpath(os.path.join(os.path.dirname(path), target))
+
+
 def _resolve_usb_sysfs_path(serial_path: str) -> str:
     """Resolve /dev/serial/by-id/ symlink to sysfs USB authorized file path."""
-    real_dev = os.path.realpath(serial_path)
+    real_dev = _follow_link(serial_path)
     tty_name = os.path.basename(real_dev)
-    sysfs_device = f"/sys/class/tty/{tty_name}/device"
-    if not os.path.exists(sysfs_device):
-        raise DiscoveryError(f"sysfs path not found: {sysfs_device}")
-    iface_path = os.path.realpath(sysfs_device)
-    usb_dev_path = os.path.dirname(iface_path)
-    authorized = os.path.join(usb_dev_path, "authorized")
-    if not os.path.exists(authorized):
-        raise DiscoveryError(f"USB authorized file not found: {authorized}")
+    sysfs_tty = f"/sys/class/tty/{tty_name}"
+    try:
+        # /sys/class/tty/<tty> is itself a link into /sys/devices; resolve it
+        # first so the relative "device" link is joined against a real path.
+        iface_path = _follow_link(os.path.join(_follow_link(sysfs_tty), "device"))
+    except FileNotFoundError:
+        raise DiscoveryError(f"sysfs path not found: {sysfs_tty}/device") from None
+    authorized = os.path.join(os.path.dirname(iface_path), "authorized")
+    try:
+        os.stat(authorized)
+    except FileNotFoundError:
+        raise DiscoveryError(f"USB authorized file not found: {authorized}") from None
     return authorized
 
 
+# Both authorized writes in one sudo call; $1 = authorized path, $2 = sleep
 def _usb_sysfs_reset(authorized_path: str) -> None:
-    """Toggle USB device authorized flag to force re-enumeration."""
+    """Toggle USB device authorized flag to force re-enumeration.
+
+    Writes directly when already root; otherwise uses ``sudo tee`` per value.
+    """
     for value in ('0', '1'):
-        result = subprocess.run(
-            ['sudo', 'tee', authorized_path],
-            input=value,
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        if result.returncode != 0:
-            raise DiscoveryError(
-                f"Failed to write '{value}' to {authorized_path}: "
-                f"{result.stderr.strip()}"
+        if os.geteuid() == 0:
+            try:
+                with open(authorized_path, 'w') as f:
+                    f.write(value)
+            except OSError as exc:
+                raise DiscoveryError(
+                    f"Failed to write '{value}' to {authorized_path}: {exc}"
+                ) from exc
+        else:
+            result = subprocess.run(
+                ['sudo', 'tee', authorized_path],
+                input=value,
+                capture_output=True,
+                text=True,
+                timeout=10,
             )
+            if result.returncode != 0:
+                raise DiscoveryError(
+                    f"Failed to write '{value}' to {authorized_path}: "
+                    f"{result.stderr.strip()}"
+                )
         if value == '0':
             time.sleep(USB_RESET_SLEEP)
 
@@ -198,20 +398,33 @@ def _poll_for_serial_device(
     pattern: str,
     timeout: float = POLL_TIMEOUT,
 ) -> Optional[str]:
-    """Poll /dev/serial/by-id/ for device matching glob pattern."""
-    serial_dir = '/dev/serial/by-id'
+    """Poll /dev/serial/by-id/ for device matching glob pattern.
+
+    Rescans as soon as inotify reports a change in the directory, so a
+    reappearing device is seen without waiting out POLL_INTERVAL.
+    """
+    from .discovery import SERIAL_BY_ID, SerialDirWatcher, _to_regex
+
+    match = _to_regex(pattern).match
     deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
-        try:
-            from .discovery import _prefix_variants
-            variants = _prefix_variants(pattern)
-            for name in os.listdir(serial_dir):
-                if any(fnmatch.fnmatch(name, v) for v in variants):
-                    return os.path.join(serial_dir, name)
-        except FileNotFoundError:
-            pass  # Directory may vanish briefly during USB reset
-        time.sleep(POLL_INTERVAL)
-    return None
+    interval = 0.005  # without inotify: back off from 5 ms up to POLL_INTERVAL
+    with SerialDirWatcher() as watcher:
+        while True:
+            try:
+                with os.scandir(SERIAL_BY_ID) as it:
+                    for entry in it:
+                        if match(entry.name):
+                            return entry.path
+            except FileNotFoundError:
+                pass  # Directory may vanish briefly during USB reset
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if watcher.active:
+                watcher.wait(min(POLL_INTERVAL, remaining))
+            else:
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 2, POLL_INTERVAL)
 
 
 def check_katapult(
@@ -238,10 +451,7 @@ def check_katapult(
     start = time.monotonic()
 
     # Extract hex serial identifier from device path
-    match = re.search(
-        r'usb-(?:Klipper|katapult)_[a-zA-Z0-9]+_([A-Fa-f0-9]+)',
-        os.path.basename(device_path),
-    )
+    match = _SERIAL_HEX_RE.search(os.path.basename(device_path))
     if not match:
         return KatapultCheckResult(
             has_katapult=None,
@@ -261,11 +471,11 @@ def check_katapult(
         )
 
     # Verify flashtool.py exists
-    flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
-    if not flashtool.exists():
+    flashtool = _find_flashtool(katapult_dir)
+    if flashtool is None:
         return KatapultCheckResult(
             has_katapult=None,
-            error_message=f"Katapult flashtool not found: {flashtool}",
+            error_message=f"Katapult flashtool not found: {_flashtool_path(katapult_dir)}",
             elapsed_seconds=time.monotonic() - start,
         )
 
@@ -274,15 +484,14 @@ def check_katapult(
         log("Entering bootloader mode...")
     try:
         result = subprocess.run(
-            ["python3", str(flashtool), "-r", "-d", device_path],
+            [_executable("python3"), flashtool, "-r", "-d", device_path],
             capture_output=True,
-            text=True,
             timeout=BOOTLOADER_ENTRY_TIMEOUT,
         )
         if result.returncode != 0:
             return KatapultCheckResult(
                 has_katapult=None,
-                error_message=result.stderr.strip() or result.stdout.strip(),
+                error_message=_failure_output(result),
                 elapsed_seconds=time.monotonic() - start,
             )
     except subprocess.TimeoutExpired:
@@ -346,6 +555,9 @@ def flash_device(
     preferred_method: str = "katapult",
     allow_fallback: bool = True,
     log: Optional[Callable[[str], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    out_dir: Optional[str] = None,
+    config_path: Optional[str] = None,
 ) -> FlashResult:
     """Flash firmware to device using Katapult or make flash.
 
@@ -361,6 +573,11 @@ def flash_device(
         preferred_method: "katapult" or "make_flash" (default: "katapult").
         allow_fallback: If True, attempt the other method on failure.
         log: Optional callback for progress messages.
+        cancel_event: Optional event; setting it terminates the running
+            flash command and skips any fallback.
+        out_dir: For out-of-tree builds, the build's OUT directory; make
+            flash then uses it instead of klipper_dir/out.
+        config_path: For out-of-tree builds, the config the build used.
 
     Returns:
         FlashResult with success status, method used, and timing.
@@ -376,27 +593,71 @@ def flash_device(
             error_message=f"Unknown flash method: {method}",
         )
 
+    # Both methods need the device node, so a missing one fails every
+    # attempt: report it instead of running (and timing out) each method.
+    if not os.path.exists(device_path):
+        return FlashResult(
+            success=False,
+            method=method,
+            elapsed_seconds=time.monotonic() - start,
+            error_message=f"Device not found: {device_path}",
+        )
+
     methods = [method]
     if allow_fallback:
         methods.append("make_flash" if method == "katapult" else "katapult")
 
+    # A missing flashtool.py or firmware file is deterministic: go straight
+    # to make flash rather than attempting (and logging) a Katapult failure.
+    if len(methods) > 1:
+        if _find_flashtool(katapult_dir) is None:
+            katapult_error = f"Katapult flashtool not found: {_flashtool_path(katapult_dir)}"
+        elif not os.path.exists(firmware_path):
+            katapult_error = f"Firmware not found: {firmware_path}"
+        else:
+            katapult_error = None
+        if katapult_error is not None:
+            methods.remove("katapult")
+            if log is not None:
+                log(katapult_error)
+                log("Using make flash...")
+
     last_result: Optional[FlashResult] = None
     for current in methods:
         if current == "katapult":
-            result = _try_katapult_flash(device_path, firmware_path, katapult_dir, timeout)
+            result = _try_katapult_flash(
+                device_path,
+                firmware_path,
+                katapult_dir,
+                timeout,
+                log=log,
+                cancel_event=cancel_event,
+            )
         else:
-            result = _try_make_flash(device_path, klipper_dir, timeout)
+            result = _try_make_flash(
+                device_path,
+                klipper_dir,
+                timeout,
+                log=log,
+                cancel_event=cancel_event,
+                out_dir=out_dir,
+                config_path=config_path,
+            )
 
         last_result = result
         if result.success:
             return result
 
-        # If no fallback, return immediately
+        # If no fallback (or the flash was cancelled), return immediately
         if not allow_fallback or current == methods[-1]:
             break
+        if cancel_event is not None and cancel_event.is_set():
+            break
 
         if log is not None:
-            log(f"{current} failed: {result.error_message}")
+            # Full output was already streamed through log; repeat only its last line
+            reason = (result.error_message or "").splitlines()
+            log(f"{current} failed: {reason[-1] if reason else 'unknown error'}")
             log("Trying fallback method...")
 
     # If all methods failed, return last result with total elapsed time
@@ -408,5 +669,4 @@ def flash_device(
             error_message="No flash methods attempted",
         )
 
-    last_result.elapsed_seconds = time.monotonic() - start
-    return last_result
+    return dataclasses.replace(last_result, elapsed_seconds=time.monotonic() - start)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Optional
 
 
@@ -17,6 +18,7 @@ class GlobalConfig:
     skip_menuconfig: bool = False
     stagger_delay: float = 2.0
     return_delay: float = 5.0
+    max_parallel_flash: int = 0  # Flash All concurrency limit (0 = all devices)
 
 
 @dataclass
@@ -30,6 +32,11 @@ class DeviceEntry:
     flash_method: Optional[str] = None  # None = use global default
     flashable: bool = True  # Non-flashable devices excluded from flash selection
 
+    @cached_property
+    def serial_pattern_lower(self) -> str:
+        """Lowercased serial_pattern, computed once per entry."""
+        return self.serial_pattern.lower()
+
 
 @dataclass
 class BlockedDevice:
@@ -46,6 +53,11 @@ class DiscoveredDevice:
     path: str  # "/dev/serial/by-id/usb-Klipper_stm32h723xx_..."
     filename: str  # "usb-Klipper_stm32h723xx_29001A001151313531383332-if00"
 
+    @cached_property
+    def filename_lower(self) -> str:
+        """Lowercased filename, computed once per scan result."""
+        return self.filename.lower()
+
 
 @dataclass
 class RegistryData:
@@ -68,7 +80,7 @@ class BuildResult:
     error_output: Optional[str] = None  # Captured build output on failure
 
 
-@dataclass
+@dataclass(frozen=True)
 class FlashResult:
     """Result of a flash operation."""
 
@@ -12,13 +12,17 @@ Endpoints used:
 
 from __future__ import annotations
 
+import http.client
 import json
+import os
 import re
 import subprocess
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional
-from urllib.error import HTTPError, URLError
-from urllib.request import urlopen
+from typing import Callable, Optional
+from urllib.parse import quote, urlsplit
 
 from .models import PrintStatus
 
@@ -26,17 +30,141 @@ from .models import PrintStatus
 MOONRAKER_URL = "http://localhost:7125"
 TIMEOUT = 5  # seconds
 
+# Keep-alive connection per thread (version fetches fan out over a thread pool)
+_MOONRAKER_ADDR = urlsplit(MOONRAKER_URL)
+_local = threading.local()
+
+# MCU object names from /printer/objects/list, reused for this many seconds
+# so repeat version queries are a single round trip
+MCU_OBJECTS_TTL = 60.0
+_mcu_objects: Optional[tuple[float, list[str]]] = None
+
+# Version response cache (print status is never cached: safety needs fresh data)
+CACHE_TTL = 5.0  # seconds a cached response is served without refetching
+_cache_lock = threading.Lock()
+_memo: dict[str, tuple[float, object]] = {}  # in-process copy of fresh cache entries
+
+
+def _cache_file() -> str:
+    """Return the on-disk response cache path (respects XDG_CACHE_HOME)."""
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache and os.path.isabs(xdg_cache):
+        base = xdg_cache
+    else:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "kalico-flash", "moonraker.json")
+
+
+def _read_cache() -> dict:
+    try:
+        with open(_cache_file(), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cache(data: dict) -> None:
+    """Best-effort atomic write: temp file + rename, errors ignored."""
+    path = _cache_file()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            mode="w", dir=os.path.dirname(path), delete=False, suffix=".tmp", encoding="utf-8"
+        ) as tf:
+            json.dump(data, tf)
+        os.replace(tf.name, path)
+    except OSError:
+        pass
+
+
+def cached_call(key: str, fn: Callable, *args, ttl: float = CACHE_TTL):
+    """Call ``fn(*args)`` through a short-lived on-disk cache.
+
+    Returns the cached value if it is younger than *ttl*. Otherwise calls
+    *fn*; a non-None result is cached and returned. None (Moonraker/git
+    unavailable) is returned as-is, never papered over with an older value.
+    Fresh entries are also kept in memory so repeat calls skip the file read.
+    """
+    now = time.time()
+    with _cache_lock:
+        memo = _memo.get(key)
+        if memo is not None and 0 <= now - memo[0] < ttl:
+            return memo[1]
+        cached = _read_cache().get(key)
+    age = now - cached["ts"] if isinstance(cached, dict) and "ts" in cached else None
+    if age is not None and 0 <= age < ttl:
+        with _cache_lock:
+            _memo[key] = (cached["ts"], cached.get("value"))
+        return cached.get("value")
+
+    value = fn(*args)
+    if value is not None:
+        with _cache_lock:
+            ts = time.time()
+            _memo[key] = (ts, value)
+            data = _read_cache()
+            data[key] = {"ts": ts, "value": value}
+            _write_cache(data)
+    return value
+
+
+def invalidate_cached(key: str) -> None:
+    """Drop *key* from the response cache (e.g. MCU versions after a flash)."""
+    with _cache_lock:
+        _memo.pop(key, None)
+        data = _read_cache()
+        if data.pop(key, None) is not None:
+            _write_cache(data)
+
+
+def _get_json(path: str) -> dict:
+    """GET *path* from Moonraker and decode the JSON response.
+
+    Reuses this thread's keep-alive connection. If the server closed a
+    reused connection, it is reopened and the request retried once.
+
+    Raises:
+        http.client.HTTPException, OSError, ValueError: On any failure.
+    """
+    conn = getattr(_local, "conn", None)
+    reused = conn is not None
+    if conn is None:
+        conn = http.client.HTTPConnection(
+            _MOONRAKER_ADDR.hostname, _MOONRAKER_ADDR.port, timeout=TIMEOUT
+        )
+        _local.conn = conn
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        body = response.read()
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        _local.conn = None
+        if not reused:
+            raise
+        return _get_json(path)
+    if response.status != 200:
+        raise http.client.HTTPException(f"HTTP {response.status} for {path}")
+    return json.loads(body.decode("utf-8"))
+
+
+# Version-string patterns used by detect_firmware_flavor / _parse_git_describe
+_KALICO_TAG_RE = re.compile(r"^v?(20[2-9]\d)\.")
+_KLIPPER_TAG_RE = re.compile(r"^v?\d+\.\d+\.\d+")
+_GIT_DESCRIBE_RE = re.compile(r"^(v[0-9A-Za-z.\-_]+?)(?:-([0-9]+)-g[0-9a-fA-F]+)?(?:-dirty)?$")
+
 
 def detect_firmware_flavor(version: Optional[str]) -> str:
     """Return 'Kalico' or 'Klipper' based on version string format."""
     if not version:
         return "Unknown"
     # Kalico uses date-based tags: v2025.xx, v2026.xx, etc.
-    match = re.match(r"^v?(20[2-9]\d)\.", version)
+    match = _KALICO_TAG_RE.match(version)
     if match and int(match.group(1)) >= 2025:
         return "Kalico"
     # Klipper uses semver-style tags: v0.12.0-...
-    if re.match(r"^v?\d+\.\d+\.\d+", version):
+    if _KLIPPER_TAG_RE.match(version):
         return "Klipper"
     return "Unknown"
 
@@ -48,9 +176,7 @@ def get_print_status() -> Optional[PrintStatus]:
         PrintStatus if successful, None if Moonraker unreachable or error.
     """
     try:
-        url = f"{MOONRAKER_URL}/printer/objects/query?print_stats&virtual_sdcard"
-        with urlopen(url, timeout=TIMEOUT) as response:
-            data = json.loads(response.read().decode("utf-8"))
+        data = _get_json("/printer/objects/query?print_stats&virtual_sdcard")
 
         status = data["result"]["status"]
         print_stats = status.get("print_stats", {})
@@ -61,7 +187,7 @@ def get_print_status() -> Optional[PrintStatus]:
             filename=print_stats.get("filename") or None,
             progress=virtual_sdcard.get("progress", 0.0),
         )
-    except (URLError, HTTPError, json.JSONDecodeError, KeyError, TimeoutError, OSError):
+    except (http.client.HTTPException, ValueError, KeyError, OSError):
         return None
 
 
@@ -73,26 +199,22 @@ def get_mcu_versions() -> Optional[dict[str, str]]:
         Names are normalized: "mcu" -> "main", "mcu nhk" -> "nhk".
         Example: {"main": "v0.12.0-45-g7ce409d", "nhk": "v0.12.0-45-g7ce409d"}
     """
+    global _mcu_objects
     try:
-        # First get list of all printer objects to discover MCUs
-        list_url = f"{MOONRAKER_URL}/printer/objects/list"
-        with urlopen(list_url, timeout=TIMEOUT) as response:
-            data = json.loads(response.read().decode("utf-8"))
-
-        # Find all MCU objects (mcu, mcu linux, mcu nhk, etc.)
-        all_objects = data["result"]["objects"]
-        mcu_objects = [obj for obj in all_objects if obj == "mcu" or obj.startswith("mcu ")]
-
-        if not mcu_objects:
-            return None
-
-        # Query MCU objects for mcu_version field
-        # URL-encode spaces as %20 for query params
-        query_params = "&".join(obj.replace(" ", "%20") for obj in mcu_objects)
-        query_url = f"{MOONRAKER_URL}/printer/objects/query?{query_params}"
-
-        with urlopen(query_url, timeout=TIMEOUT) as response:
-            data = json.loads(response.read().decode("utf-8"))
+        # Discover MCU objects (mcu, mcu linux, mcu nhk, etc.) unless known
+        if _mcu_objects is not None and time.monotonic() - _mcu_objects[0] < MCU_OBJECTS_TTL:
+            mcu_objects = _mcu_objects[1]
+        else:
+            data = _get_json("/printer/objects/list")
+            all_objects = data["result"]["objects"]
+            mcu_objects = [obj for obj in all_objects if obj == "mcu" or obj.startswith("mcu ")]
+            if not mcu_objects:
+                return None
+            _mcu_objects = (time.monotonic(), mcu_objects)
+
+        # Query MCU objects for mcu_version field ("mcu nhk" -> "mcu%20nhk")
+        query_params = "&".join(quote(obj) for obj in mcu_objects)
+        data = _get_json(f"/printer/objects/query?{query_params}")
 
         versions: dict[str, str] = {}
         for mcu_name, mcu_data in data["result"]["status"].items():
@@ -115,10 +237,18 @@ def get_mcu_versions() -> Optional[dict[str, str]]:
 
         return versions if versions else None
 
-    except (URLError, HTTPError, json.JSONDecodeError, KeyError, TimeoutError, OSError):
+    except (http.client.HTTPException, ValueError, KeyError, OSError):
+        _mcu_objects = None  # Klipper may have restarted with another config
         return None
 
 
+# Prints nearest tag (empty line if none), commit count and short hash
+_VERSION_FALLBACK_SCRIPT = (
+    "git describe --tags --abbrev=0 2>/dev/null || echo; "
+    "git rev-list --count HEAD && git rev-parse --short HEAD"
+)
+
+
 def get_host_klipper_version(klipper_dir: str) -> Optional[str]:
     """Get host Klipper version via git describe.
 
@@ -145,35 +275,21 @@ def get_host_klipper_version(klipper_dir: str) -> Optional[str]:
             version = result.stdout.strip()
             if version and "-g" in version:
                 return version
-            # Fallback: synthesize vX-Y-gHASH when git describe returns tag-only
-            tag = version if version.startswith("v") else None
-            if not tag:
-                tag_result = subprocess.run(
-                    ["git", "describe", "--tags", "--abbrev=0"],
-                    cwd=str(klipper_path),
-                    capture_output=True,
-                    text=True,
-                    timeout=TIMEOUT,
-                )
-                if tag_result.returncode == 0:
-                    tag = tag_result.stdout.strip()
-            count_result = subprocess.run(
-                ["git", "rev-list", "--count", "HEAD"],
-                cwd=str(klipper_path),
-                capture_output=True,
-                text=True,
-                timeout=TIMEOUT,
-            )
-            hash_result = subprocess.run(
-                ["git", "rev-parse", "--short", "HEAD"],
+            # Fallback: synthesize vX-Y-gHASH when git describe returns tag-only.
+            # Tag, commit count and short hash come from one shell so the
+            # fallback costs a single extra fork rather than three.
+            fallback = subprocess.run(
+                ["sh", "-c", _VERSION_FALLBACK_SCRIPT],
                 cwd=str(klipper_path),
                 capture_output=True,
                 text=True,
                 timeout=TIMEOUT,
             )
-            if count_result.returncode == 0 and hash_result.returncode == 0:
-                count = count_result.stdout.strip()
-                short_hash = hash_result.stdout.strip()
+            fields = fallback.stdout.split("\n")
+            if fallback.returncode == 0 and len(fields) >= 3:
+                tag = version if version.startswith("v") else fields[0].strip()
+                count = fields[1].strip()
+                short_hash = fields[2].strip()
                 if tag:
                     return f"{tag}-{count}-g{short_hash}"
                 return f"{count}-g{short_hash}"
@@ -196,10 +312,7 @@ def _parse_git_describe(version: str) -> tuple[Optional[str], Optional[int]]:
     #   v0.12.0-0-g7ce409d
     #   v0.12.0-45-g7ce409d-dirty
     #   v2026.01.00
-    match = re.match(
-        r"^(v[0-9A-Za-z.\-_]+?)(?:-([0-9]+)-g[0-9a-fA-F]+)?(?:-dirty)?$",
-        v,
-    )
+    match = _GIT_DESCRIBE_RE.match(v)
     if not match:
         return None, None
     tag = match.group(1)
@@ -207,7 +320,9 @@ def _parse_git_describe(version: str) -> tuple[Optional[str], Optional[int]]:
     return tag, count
 
 
-def get_mcu_version_for_device(mcu_type: str) -> Optional[str]:
+def get_mcu_version_for_device(
+    mcu_type: str, mcu_versions: Optional[dict[str, str]] = None
+) -> Optional[str]:
     """Get MCU firmware version for a specific device by its mcu_type.
 
     Attempts to match the device's mcu_type (e.g., "stm32h723", "rp2040", "nhk")
@@ -220,11 +335,15 @@ def get_mcu_version_for_device(mcu_type: str) -> Optional[str]:
 
     Args:
         mcu_type: Device MCU type string (e.g., "stm32h723", "rp2040", "nhk")
+        mcu_versions: Snapshot from get_mcu_versions(); pass it when looking
+            up several devices to avoid one Moonraker query per device.
+            Fetched if None.
 
     Returns:
         Version string like "v0.12.0-45-g7ce409d" or None if unavailable.
     """
-    mcu_versions = get_mcu_versions()
+    if mcu_versions is None:
+        mcu_versions = get_mcu_versions()
     if not mcu_versions:
         return None
 
@@ -253,7 +372,8 @@ def is_mcu_outdated(host_version: str, mcu_version: str) -> bool:
     """
     host = host_version.strip()
     mcu = mcu_version.strip()
-    if not host or not mcu:
+    if not host or not mcu or host == mcu:
+        # Identical versions are never outdated; skip git-describe parsing
         return False
 
     host_tag, host_count = _parse_git_describe(host)
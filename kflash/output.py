@@ -13,6 +13,7 @@ class Output(Protocol):
     CLI provides CliOutput. Future Moonraker provides MoonrakerOutput."""
 
     def info(self, section: str, message: str) -> None: ...
+    def info_block(self, section: str, messages: list[str]) -> None: ...
     def success(self, message: str) -> None: ...
     def warn(self, message: str) -> None: ...
     def error(self, message: str) -> None: ...
@@ -24,6 +25,7 @@ class Output(Protocol):
         recovery: str | None = None,
     ) -> None: ...
     def device_line(self, marker: str, name: str, detail: str) -> None: ...
+    def device_lines(self, lines: list[tuple[str, str, str]]) -> None: ...
     def prompt(self, message: str, default: str = "") -> str: ...
     def confirm(self, message: str, default: bool = False) -> bool: ...
     def mcu_mismatch_choice(self, actual_mcu: str, expected_mcu: str, device_name: str) -> str: ...
@@ -42,6 +44,12 @@ class CliOutput:
         t = self.theme
         print(f"{t.info}[{section}]{t.reset} {message}")
 
+    def info_block(self, section: str, messages: list[str]) -> None:
+        """Like info() per message, but written with a single print."""
+        t = self.theme
+        prefix = f"{t.info}[{section}]{t.reset} "
+        print("\n".join(prefix + message for message in messages))
+
     def success(self, message: str) -> None:
         t = self.theme
         print(f"{t.success}[OK]{t.reset} {message}")
@@ -67,7 +75,7 @@ class CliOutput:
         formatted = format_error(error_type, message, context, recovery)
         print(formatted, file=sys.stderr)
 
-    def device_line(self, marker: str, name: str, detail: str) -> None:
+    def _format_device_line(self, marker: str, name: str, detail: str) -> str:
         t = self.theme
         marker_styles = {
             "REG": t.marker_reg,
@@ -80,7 +88,15 @@ class CliOutput:
             style = t.marker_num
         else:
             style = marker_styles.get(marker.upper(), "")
-        print(f"  {style}[{marker}]{t.reset} {name:<24s} {detail}")
+        return f"  {style}[{marker}]{t.reset} {name:<24s} {detail}"
+
+    def device_line(self, marker: str, name: str, detail: str) -> None:
+        print(self._format_device_line(marker, name, detail))
+
+    def device_lines(self, lines: list[tuple[str, str, str]]) -> None:
+        """Like device_line() per (marker, name, detail), but written with a single print."""
+        if lines:
+            print("\n".join(self._format_device_line(*line) for line in lines))
 
     def prompt(self, message: str, default: str = "") -> str:
         t = self.theme
@@ -135,6 +151,9 @@ class NullOutput:
     def info(self, section: str, message: str) -> None:
         pass
 
+    def info_block(self, section: str, messages: list[str]) -> None:
+        pass
+
     def success(self, message: str) -> None:
         pass
 
@@ -156,6 +175,9 @@ class NullOutput:
     def device_line(self, marker: str, name: str, detail: str) -> None:
         pass
 
+    def device_lines(self, lines: list[tuple[str, str, str]]) -> None:
+        pass
+
     def prompt(self, message: str, default: str = "") -> str:
         return default
 
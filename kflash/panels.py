@@ -71,12 +71,9 @@ def render_panel(
     header_plain = _spaced_header(header)
     header_display = f"{theme.header}{header_plain}{theme.reset}"
 
-    # Calculate inner width from content
-    max_content_w = 0
-    for line in content_lines:
-        w = display_width(line)
-        if w > max_content_w:
-            max_content_w = w
+    # Calculate inner width from content (widths reused when padding below)
+    widths = [display_width(line) for line in content_lines]
+    max_content_w = max(widths, default=0)
 
     header_plain_w = display_width(header_plain)
     min_inner = max(max_content_w + 2 * padding, header_plain_w + 2)
@@ -97,21 +94,16 @@ def render_panel(
     )
 
     # Content lines: │  content padded  │
-    for line in content_lines:
-        padded = " " * padding + line
-        padded = pad_to_width(padded, inner_width - padding) + " " * padding
+    edge = f"{theme.border}{b['v']}{theme.reset}"
+    pad = " " * padding
+    body_width = inner_width - 2 * padding
+    for line, width in zip(content_lines, widths):
         # Clamp: ensure exactly inner_width visible columns
-        padded = " " * padding + pad_to_width(line, inner_width - 2 * padding) + " " * padding
-        lines.append(
-            f"{theme.border}{b['v']}{theme.reset}{padded}{theme.border}{b['v']}{theme.reset}"
-        )
+        lines.append(f"{edge}{pad}{pad_to_width(line, body_width, current=width)}{pad}{edge}")
 
     # Empty panel: add one blank line
     if not content_lines:
-        blank = " " * inner_width
-        lines.append(
-            f"{theme.border}{b['v']}{theme.reset}{blank}{theme.border}{b['v']}{theme.reset}"
-        )
+        lines.append(f"{edge}{' ' * inner_width}{edge}")
 
     # Bottom border: ╰────────────────────╯
     bottom_fill = b["h"] * inner_width
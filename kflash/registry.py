@@ -12,6 +12,13 @@ from .errors import RegistryError
 from .models import BlockedDevice, DeviceEntry, GlobalConfig, RegistryData
 
 
+def _canonical_flash_method(value) -> Optional[str]:
+    """Normalize a stored flash method to lowercase, or None if unset."""
+    if not isinstance(value, str):
+        return None
+    return value.strip().lower() or None
+
+
 class Registry:
     """Device registry with JSON CRUD and atomic writes."""
 
@@ -32,11 +39,14 @@ class Registry:
         global_config = GlobalConfig(
             klipper_dir=global_raw.get("klipper_dir", "~/klipper"),
             katapult_dir=global_raw.get("katapult_dir", "~/katapult"),
-            default_flash_method=global_raw.get("default_flash_method", "katapult"),
+            default_flash_method=(
+                _canonical_flash_method(global_raw.get("default_flash_method")) or "katapult"
+            ),
             allow_flash_fallback=global_raw.get("allow_flash_fallback", True),
             skip_menuconfig=global_raw.get("skip_menuconfig", False),
             stagger_delay=global_raw.get("stagger_delay", 2.0),
             return_delay=global_raw.get("return_delay", 5.0),
+            max_parallel_flash=int(global_raw.get("max_parallel_flash", 0)),
         )
         devices: dict[str, DeviceEntry] = {}
         for key, data in raw.get("devices", {}).items():
@@ -45,7 +55,7 @@ class Registry:
                 name=data["name"],
                 mcu=data["mcu"],
                 serial_pattern=data["serial_pattern"],
-                flash_method=data.get("flash_method"),
+                flash_method=_canonical_flash_method(data.get("flash_method")),
                 flashable=data.get("flashable", True),  # Default to True if missing
             )
 
@@ -81,6 +91,7 @@ class Registry:
                 "skip_menuconfig": registry.global_config.skip_menuconfig,
                 "stagger_delay": registry.global_config.stagger_delay,
                 "return_delay": registry.global_config.return_delay,
+                "max_parallel_flash": registry.global_config.max_parallel_flash,
             },
             "devices": {},
             "blocked_devices": [],
@@ -164,7 +175,19 @@ class Registry:
 
 
 def _atomic_write_json(path: str, data: dict) -> None:
-    """Write JSON atomically: write to temp file, fsync, rename."""
+    """Write JSON atomically: write to temp file, fsync, rename.
+
+    Skipped entirely when the file already holds identical content, so
+    no-op saves cost one read instead of a write, fsync and rename.
+    """
+    text = json.dumps(data, indent=2, sort_keys=True) + "\n"
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                return
+    except (OSError, UnicodeDecodeError):
+        pass
+
     dir_name = os.path.dirname(os.path.abspath(path))
     os.makedirs(dir_name, exist_ok=True)
     with tempfile.NamedTemporaryFile(
@@ -172,8 +195,7 @@ def _atomic_write_json(path: str, data: dict) -> None:
     ) as tf:
         tmp_path = tf.name
         try:
-            json.dump(data, tf, indent=2, sort_keys=True)
-            tf.write("\n")
+            tf.write(text)
             tf.flush()
             os.fsync(tf.fileno())
         except BaseException:
@@ -36,6 +36,15 @@ SETTINGS: list[dict] = [
         "min": 0,
         "max": 60,
     },
+    {
+        "key": "max_parallel_flash",
+        "label": "Parallel flash limit (0 = all)",
+        "type": "numeric",
+        "min": 0,
+        "max": 16,
+        "unit": "",
+        "integer": True,
+    },
     {"key": "klipper_dir", "label": "Klipper directory", "type": "path"},
     {"key": "katapult_dir", "label": "Katapult directory", "type": "path"},
 ]
@@ -121,7 +130,7 @@ def truncate_serial(path: str, max_width: int = 40) -> str:
 def build_device_list(
     registry_data,
     usb_devices: list,
-    blocked_list: list[tuple[str, Optional[str]]],
+    blocked_list: list,
     mcu_versions: Optional[dict[str, str]] = None,
 ) -> list[DeviceRow]:
     """Build a numbered device list grouped by status.
@@ -135,7 +144,7 @@ def build_device_list(
     Args:
         registry_data: RegistryData with devices and blocked_devices.
         usb_devices: List of DiscoveredDevice from USB scan.
-        blocked_list: Pre-built blocked patterns list.
+        blocked_list: Pre-built blocked patterns list from flash._build_blocked_list.
         mcu_versions: Optional MCU version map from Moonraker.
 
     Returns:
@@ -143,28 +152,21 @@ def build_device_list(
     """
     import fnmatch
 
-    from .discovery import extract_mcu_from_serial, is_supported_device, match_devices
+    from .discovery import cross_reference_devices, extract_mcu_from_serial, is_supported_device
 
     if mcu_versions is None:
         mcu_versions = {}
 
     # Cross-reference registry against USB
-    entry_matches: dict[str, list] = {}
-    device_matches: dict[str, list] = {}
-    for entry in registry_data.devices.values():
-        matches = match_devices(entry.serial_pattern, usb_devices)
-        entry_matches[entry.key] = matches
-        for device in matches:
-            device_matches.setdefault(device.filename, []).append(entry)
+    entry_matches, device_matches = cross_reference_devices(usb_devices, registry_data.devices)
 
     matched_filenames = set(device_matches.keys())
     unmatched = [d for d in usb_devices if d.filename not in matched_filenames]
 
     # Helper to check blocked status
-    def _is_blocked(filename: str) -> tuple[bool, str]:
-        name = filename.lower()
+    def _is_blocked(name: str) -> tuple[bool, str]:
         for pattern, reason in blocked_list:
-            pat = pattern.lower()
+            pat = pattern
             if not pat.startswith("*"):
                 pat = "*" + pat
             if not pat.endswith("*"):
@@ -218,7 +220,7 @@ def build_device_list(
             registered_disconnected.append(row)
 
     for device in unmatched:
-        blocked, reason = _is_blocked(device.filename)
+        blocked, reason = _is_blocked(device.filename_lower)
         if blocked or not is_supported_device(device.filename):
             blocked_devices.append(
                 DeviceRow(
@@ -474,7 +476,7 @@ def render_config_screen(gc: GlobalConfig) -> str:
         if setting["type"] == "toggle":
             display = "ON" if value else "OFF"
         elif setting["type"] == "numeric":
-            display = f"{value}s"
+            display = f"{value}{setting.get('unit', 's')}"
         else:
             display = str(value)
         settings_lines.append(
@@ -14,6 +14,7 @@ from __future__ import annotations
 
 import os
 import sys
+from typing import Callable
 
 from .theme import clear_screen, get_theme
 
@@ -245,18 +246,21 @@ def _build_screen_state(registry, status_message: str, status_level: str):
     from .screen import ScreenState, build_device_list
 
     data = registry.load()
-    usb_devices = scan_serial_devices()
+    usb_devices = scan_serial_devices(sort=True)
     blocked_list = _build_blocked_list(data)
 
     # Fetch version info (best effort)
     mcu_versions = None
     host_version = None
     try:
-        from .moonraker import get_host_klipper_version, get_mcu_versions
+        from .moonraker import cached_call, get_host_klipper_version, get_mcu_versions
 
-        mcu_versions = get_mcu_versions()
+        mcu_versions = cached_call("mcu_versions", get_mcu_versions)
         if data.global_config:
-            host_version = get_host_klipper_version(data.global_config.klipper_dir)
+            klipper_dir = data.global_config.klipper_dir
+            host_version = cached_call(
+                f"host_version:{klipper_dir}", get_host_klipper_version, klipper_dir
+            )
     except Exception:
         pass
 
@@ -701,7 +705,9 @@ def _config_screen(registry, out) -> None:
                         break
                     if not raw:
                         break
-                    ok, val, err = validate_numeric_setting(raw, setting["min"], setting["max"])
+                    ok, val, err = validate_numeric_setting(
+                        raw, setting["min"], setting["max"], setting.get("integer", False)
+                    )
                     if ok:
                         new_gc = dataclasses.replace(gc, **{field_key: val})
                         registry.save_global(new_gc)
@@ -913,57 +919,63 @@ def wait_for_device(
     timeout: float = 30.0,
     interval: float = 0.5,
     out=None,
+    stop: Callable[[], bool] | None = None,
 ) -> tuple[bool, str | None, str | None]:
     """Poll for device to reappear after flash.
 
     Prints progress dots every 2 seconds when ``out`` is None. Checks both
     device existence AND prefix (``Klipper_`` expected, ``katapult_`` means failure).
+    Gives up within *interval* once *stop* (if given) returns True.
 
     Returns:
         A 3-tuple ``(success, device_path, error_reason)``.
     """
-    import fnmatch
     import time
 
-    from .discovery import scan_serial_devices
+    from .discovery import SerialDirWatcher, _to_regex, scan_serial_devices
 
+    match = _to_regex(serial_pattern).match
     start = time.monotonic()
     last_dot_time = start
 
     if out is None:
         print("Verifying", end="", flush=True)
 
-    while time.monotonic() - start < timeout:
-        now = time.monotonic()
-        if out is None and now - last_dot_time >= 2.0:
-            print(".", end="", flush=True)
-            last_dot_time = now
-
-        devices = scan_serial_devices()
-        for device in devices:
-            from .discovery import _prefix_variants
-            variants = _prefix_variants(serial_pattern)
-            if any(fnmatch.fnmatch(device.filename, v) for v in variants):
+    with SerialDirWatcher() as watcher:
+        while time.monotonic() - start < timeout:
+            if stop is not None and stop():
                 if out is None:
                     print()
+                return (False, None, "Verification cancelled")
+            now = time.monotonic()
+            if out is None and now - last_dot_time >= 2.0:
+                print(".", end="", flush=True)
+                last_dot_time = now
+
+            devices = scan_serial_devices()
+            for device in devices:
+                if match(device.filename):
+                    if out is None:
+                        print()
+
+                    filename_lower = device.filename_lower
+                    if filename_lower.startswith("usb-klipper_"):
+                        return (True, device.path, None)
+                    elif filename_lower.startswith("usb-katapult_"):
+                        return (
+                            False,
+                            device.path,
+                            "Device in bootloader mode (katapult)",
+                        )
+                    else:
+                        return (
+                            False,
+                            device.path,
+                            f"Unexpected device prefix: {device.filename}",
+                        )
 
-                filename_lower = device.filename.lower()
-                if filename_lower.startswith("usb-klipper_"):
-                    return (True, device.path, None)
-                elif filename_lower.startswith("usb-katapult_"):
-                    return (
-                        False,
-                        device.path,
-                        "Device in bootloader mode (katapult)",
-                    )
-                else:
-                    return (
-                        False,
-                        device.path,
-                        f"Unexpected device prefix: {device.filename}",
-                    )
-
-        time.sleep(interval)
+            # Rescan early when /dev/serial changes; interval bounds the wait
+            watcher.wait(interval)
 
     if out is None:
         print()
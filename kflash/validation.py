@@ -13,10 +13,12 @@ from itertools import count
 
 
 def validate_numeric_setting(
-    raw: str, min_val: float, max_val: float
-) -> tuple[bool, float | None, str]:
+    raw: str, min_val: float, max_val: float, integer: bool = False
+) -> tuple[bool, float | int | None, str]:
     """Validate a numeric setting value.
 
+    With *integer*, only whole numbers are accepted and an int is returned.
+
     Returns:
         (is_valid, parsed_value, error_message)
     """
@@ -28,6 +30,11 @@ def validate_numeric_setting(
     if val < min_val or val > max_val:
         return False, None, f"Must be between {min_val} and {max_val}"
 
+    if integer:
+        if not val.is_integer():
+            return False, None, "Must be a whole number"
+        return True, int(val), ""
+
     return True, val, ""
 
 
@@ -91,7 +98,8 @@ def generate_device_key(name: str, registry) -> str:
 
     Args:
         name: Human-readable device name.
-        registry: Registry instance for collision checking.
+        registry: Registry instance, or a key -> DeviceEntry mapping such as
+            ``RegistryData.devices``, for collision checking.
 
     Returns:
         A unique slug string, at most 64 characters.